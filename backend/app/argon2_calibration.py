@@ -0,0 +1,143 @@
+"""
+Argon2 Calibration Module for BiosciZone
+Picks Argon2id cost parameters that hash in a target time on this host
+
+Run from the repository root to print settings for the current machine:
+    python -m backend.app.argon2_calibration --target-ms 100
+or to store them as the parameters every worker uses with ARGON2_CALIBRATE_ON_STARTUP:
+    python -m backend.app.argon2_calibration --target-ms 100 --save
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from typing import NamedTuple, Optional
+
+from argon2.low_level import Type, hash_secret_raw
+
+# OWASP's floor for Argon2id: 19 MiB of memory with two passes
+DEFAULT_MIN_MEMORY_COST = 19456
+DEFAULT_MIN_TIME_COST = 2
+# argon2-cffi's default memory cost (64 MiB)
+DEFAULT_MAX_MEMORY_COST = 65536
+# system_settings row holding the stored calibration; it has no expiry, so it
+# only changes when an operator stores a new one
+SETTING_KEY = "argon2_parameters"
+
+
+class Calibration(NamedTuple):
+    time_cost: int
+    memory_cost: int  # KiB
+    parallelism: int
+    milliseconds: float  # measured hash time with these parameters
+
+
+def measure(time_cost: int, memory_cost: int, parallelism: int, samples: int = 3) -> float:
+    """Median milliseconds for one hash with the given parameters"""
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hash_secret_raw(b"calibration password", os.urandom(16), time_cost, memory_cost, parallelism, 32, Type.ID)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(
+    target_ms: float,
+    parallelism: int,
+    min_memory_cost: int = DEFAULT_MIN_MEMORY_COST,
+    max_memory_cost: int = DEFAULT_MAX_MEMORY_COST,
+    min_time_cost: int = DEFAULT_MIN_TIME_COST,
+    samples: int = 3,
+) -> Calibration:
+    """
+    Largest cost that still hashes within target_ms, never below the floors
+
+    Memory is preferred over passes: start at max_memory_cost and halve it
+    until min_time_cost passes fit the target, then add as many passes as the
+    remaining budget allows. On a host too slow for the floors, the floors win.
+    """
+    min_memory_cost = max(min_memory_cost, 8 * parallelism)
+    memory_cost = max(max_memory_cost, min_memory_cost)
+    time_cost = min_time_cost
+    elapsed = measure(time_cost, memory_cost, parallelism, samples)
+    while elapsed > target_ms and memory_cost > min_memory_cost:
+        memory_cost = max(memory_cost // 2, min_memory_cost)
+        elapsed = measure(time_cost, memory_cost, parallelism, samples)
+
+    # The first pass also allocates and fills memory, so later passes are cheaper; step up rather than extrapolate
+    while elapsed <= target_ms:
+        candidate = measure(time_cost + 1, memory_cost, parallelism, samples)
+        if candidate > target_ms:
+            break
+        time_cost += 1
+        elapsed = candidate
+    return Calibration(time_cost, memory_cost, parallelism, round(elapsed, 1))
+
+
+def load_parameters(conn) -> Optional[Calibration]:
+    """The stored calibration, or None when none has been stored"""
+    row = conn.execute("SELECT value FROM system_settings WHERE key = ?", [SETTING_KEY]).fetchone()
+    if row is None:
+        return None
+    try:
+        return Calibration(**json.loads(row[0]))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid system setting {SETTING_KEY!r}: {row[0]!r}") from e
+
+
+def store_parameters(conn, result: Calibration, replace: bool = False) -> Calibration:
+    """
+    Store a calibration and return the one now stored
+
+    Without `replace`, a calibration stored first (by another process) is kept.
+    """
+    conflict = (
+        "DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP, updated_by = excluded.updated_by"
+        if replace else "DO NOTHING"
+    )
+    conn.execute(
+        f"INSERT INTO system_settings (key, value, updated_by) VALUES (?, ?, ?) ON CONFLICT(key) {conflict}",
+        [SETTING_KEY, json.dumps(result._asdict()), "argon2_calibration"]
+    )
+    conn.commit()
+    return load_parameters(conn)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=100.0)
+    parser.add_argument("--parallelism", type=int, default=4)
+    parser.add_argument("--min-memory-cost", type=int, default=DEFAULT_MIN_MEMORY_COST, help="KiB")
+    parser.add_argument("--max-memory-cost", type=int, default=DEFAULT_MAX_MEMORY_COST, help="KiB")
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--save", action="store_true",
+                        help="store the result in the database, replacing the stored calibration")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    result = calibrate(
+        args.target_ms, args.parallelism, args.min_memory_cost, args.max_memory_cost, samples=args.samples
+    )
+    print(f"# {result.milliseconds:.1f} ms per hash on this host (target {args.target_ms:g} ms)")
+    print(f"ARGON2_TIME_COST={result.time_cost}")
+    print(f"ARGON2_MEMORY_COST={result.memory_cost}")
+    print(f"ARGON2_PARALLELISM={result.parallelism}")
+    if args.save:
+        # Needs the app's database settings; printing alone does not
+        from .database import connect
+
+        conn = connect()
+        try:
+            store_parameters(conn, result, replace=True)
+        finally:
+            conn.close()
+        print(f"# Stored as system setting {SETTING_KEY!r}; restart the workers to use it")
+
+
+if __name__ == "__main__":
+    main()
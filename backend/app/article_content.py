@@ -0,0 +1,110 @@
+"""
+Article Content Module for BiosciZone
+Compressed storage of article bodies, the plain-text excerpts shown in lists and body search
+"""
+
+import html
+import re
+import zlib
+from typing import Optional, Tuple
+
+from .config import settings
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# Article list columns; bodies live in article_bodies and are only read for a single article
+ARTICLE_SUMMARY_COLUMNS = "id, category, title, excerpt, author, external_link, file_url, publication_date, created_at"
+# One article with its stored body as the last two columns (see with_body)
+ARTICLE_DETAIL_QUERY = (
+    "SELECT a.*, b.encoding AS body_encoding, b.body FROM articles a "
+    "LEFT JOIN article_bodies b ON b.article_id = a.id WHERE a.id = ?"
+)
+
+# Bodies below this size are stored as-is; compressing them saves next to nothing
+MIN_COMPRESS_SIZE = 256
+
+_TAG_PATTERN = re.compile(r"<[^>]*>")
+_SPACE_PATTERN = re.compile(r"\s+")
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def body_encoding() -> str:
+    """Encoding used for newly written bodies; zstd needs the optional zstandard package"""
+    if settings.ARTICLE_BODY_COMPRESSION == "zstd" and zstandard is not None:
+        return "zstd"
+    return "zlib"
+
+
+def encode_body(content: str) -> Tuple[str, bytes]:
+    """Compress an article body, returning (encoding, stored bytes)"""
+    data = content.encode("utf-8")
+    if len(data) < MIN_COMPRESS_SIZE:
+        return "identity", data
+    encoding = body_encoding()
+    level = settings.ARTICLE_BODY_COMPRESSION_LEVEL
+    if encoding == "zstd":
+        compressed = zstandard.ZstdCompressor(level=level).compress(data)
+    else:
+        compressed = zlib.compress(data, min(level, 9))
+    if len(compressed) >= len(data):
+        return "identity", data
+    return encoding, compressed
+
+
+def decode_body(encoding: str, body: bytes) -> str:
+    if encoding == "identity":
+        data = body
+    elif encoding == "zlib":
+        data = zlib.decompress(body)
+    elif encoding == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Article body is zstd-compressed but zstandard is not installed")
+        data = zstandard.ZstdDecompressor().decompress(body)
+    else:
+        raise ValueError(f"Unsupported article body encoding: {encoding}")
+    return data.decode("utf-8")
+
+
+def with_body(article: dict, row) -> dict:
+    """Fill article["content"] from a row read with ARTICLE_DETAIL_QUERY"""
+    body_encoding, body = row[-2], row[-1]
+    article["content"] = decode_body(body_encoding, body) if body is not None else None
+    return article
+
+
+def plain_text(content: str) -> str:
+    """Text of an HTML body without tags, entities or repeated whitespace"""
+    return _SPACE_PATTERN.sub(" ", html.unescape(_TAG_PATTERN.sub(" ", content))).strip()
+
+
+def make_excerpt(content: Optional[str]) -> Optional[str]:
+    """Plain-text start of an HTML body, cut at a word boundary"""
+    if not content:
+        return None
+    text = plain_text(content)
+    limit = settings.ARTICLE_EXCERPT_LENGTH
+    if len(text) <= limit:
+        return text or None
+    cut = text.rfind(" ", 0, limit)
+    return text[:cut if cut > 0 else limit].rstrip(" ,.;:") + "…"
+
+
+def search_query(q: str) -> Optional[str]:
+    """FTS5 query matching bodies that contain every word of `q`, each as a prefix"""
+    words = _WORD_PATTERN.findall(q)
+    return " ".join(f'"{word}"*' for word in words) or None
+
+
+def article_search_condition(q: str) -> Tuple[str, list]:
+    """WHERE clause (and its params) for articles matching `q` in the title, author or body"""
+    keyword = f"%{q}%"
+    condition = "title LIKE ? OR author LIKE ?"
+    params = [keyword, keyword]
+    match = search_query(q)
+    if match:
+        condition += " OR id IN (SELECT rowid FROM article_search WHERE article_search MATCH ?)"
+        params.append(match)
+    return f"({condition})", params
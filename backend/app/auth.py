@@ -1,16 +1,39 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
-from fastapi import Depends, HTTPException, status
+from argon2.exceptions import InvalidHashError, VerifyMismatchError
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from .config import settings
-import libsql
+from .argon2_calibration import Calibration, calibrate, load_parameters, store_parameters
+from .database import connect, db_connection
+from .rate_limit import login_lockout, too_many_requests
+from .scheduler import scheduler
+
+logger = logging.getLogger(__name__)
 
 # Argon2 password hasher - no password length limit, memory-hard
-ph = PasswordHasher()
+ph = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST,
+    parallelism=settings.ARGON2_PARALLELISM,
+)
+# Upper bound for benchmarking the host when no calibration is stored yet
+CALIBRATION_TIMEOUT_SECONDS = 120.0
+# Claim marking the tokens that may only open the admin event stream; they travel in a
+# URL (EventSource cannot send headers) and so can end up in access logs
+STREAM_TOKEN_SCOPE = "events"
+# Upper bound for re-hashing a password after login, including the write
+REHASH_TIMEOUT_SECONDS = 30.0
+# Hashing is CPU-bound; keep it off the event loop and bounded by core count
+_hash_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="argon2")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/admin/login")
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="api/admin/login", auto_error=False)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password using Argon2"""
@@ -24,29 +47,111 @@ def get_password_hash(password: str) -> str:
     """Hash password using Argon2"""
     return ph.hash(password)
 
-def get_admin_from_db(username: str):
-    """Get admin from database by username, including role"""
-    conn = libsql.connect(
-        settings.TURSO_DATABASE_URL,
-        auth_token=settings.TURSO_AUTH_TOKEN
-    )
-    cursor = conn.execute(
-        "SELECT username, hashed_password, role FROM admins WHERE username = ?",
-        [username]
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify password on the hashing executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash password on the hashing executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, get_password_hash, password)
+
+def stored_calibration(calibrate_if_missing: bool = False) -> Optional[Calibration]:
+    """
+    The Argon2 parameters stored in the DB (blocking)
+
+    With `calibrate_if_missing`, a host without a stored calibration is
+    benchmarked first and the result stored; if another process stored one
+    meanwhile, that one is kept and returned.
+    """
+    conn = connect()
+    try:
+        stored = load_parameters(conn)
+        if stored is None and calibrate_if_missing:
+            result = calibrate(
+                settings.ARGON2_TARGET_MS,
+                settings.ARGON2_PARALLELISM,
+                min_memory_cost=settings.ARGON2_MIN_MEMORY_COST,
+                max_memory_cost=settings.ARGON2_MAX_MEMORY_COST,
+            )
+            logger.info(f"Argon2 calibrated to {result.milliseconds:.0f} ms per hash: "
+                        f"time_cost={result.time_cost} memory_cost={result.memory_cost} parallelism={result.parallelism}")
+            stored = store_parameters(conn, result)
+        return stored
+    finally:
+        conn.close()
+
+async def use_calibrated_hasher(calibrate_if_missing: bool = False) -> bool:
+    """Switch `ph` to the stored calibration; False when none is stored"""
+    global ph
+    loop = asyncio.get_running_loop()
+    stored = await loop.run_in_executor(_hash_executor, stored_calibration, calibrate_if_missing)
+    if stored is None:
+        return False
+    ph = PasswordHasher(
+        time_cost=stored.time_cost,
+        memory_cost=stored.memory_cost,
+        parallelism=stored.parallelism,
     )
-    row = cursor.fetchone()
-    conn.close()
-    return row  # Returns (username, hashed_password, role) or None
+    return True
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash was made with other parameters than `ph` uses now"""
+    try:
+        return ph.check_needs_rehash(hashed_password)
+    except InvalidHashError:
+        return False
+
+async def rehash_password(username: str, password: str, old_hash: str):
+    """Store a hash with the current parameters, unless the password changed meanwhile"""
+    new_hash = await get_password_hash_async(password)
+    async with db_connection() as conn:
+        await conn.execute(
+            "UPDATE admins SET hashed_password = ? WHERE username = ? AND hashed_password = ?",
+            [new_hash, username, old_hash]
+        )
+        await conn.commit()
+
+async def get_admin_from_db(username: str):
+    """Get admin from database by username, including role"""
+    async with db_connection() as conn:
+        rs = await conn.execute(
+            "SELECT username, hashed_password, role FROM admins WHERE username = ?",
+            [username]
+        )
+        return rs.fetchone()  # Returns (username, hashed_password, role) or None
 
-def authenticate_user(username: str, password: str):
+async def authenticate_user(username: str, password: str, client_ip: Optional[str] = None):
     """Authenticate user and return role if successful"""
+    # Reject locked-out callers before any DB lookup or password hashing
+    lockout_key = f"{username.lower()}|{client_ip or ''}"
+    retry_after = await login_lockout.retry_after(lockout_key)
+    if retry_after > 0:
+        raise too_many_requests(retry_after, "Too many failed login attempts, please try again later")
+
+    user = await _check_credentials(username, password)
+    if user:
+        await login_lockout.reset(lockout_key)
+    else:
+        await login_lockout.record_failure(lockout_key)
+    return user
+
+async def _check_credentials(username: str, password: str):
     # First, check database for admin
-    admin = get_admin_from_db(username)
+    admin = await get_admin_from_db(username)
     if admin:
         # admin is a tuple: (username, hashed_password, role)
         stored_hash = admin[1]
         role = admin[2] or "admin"
-        if verify_password(password, stored_hash):
+        if await verify_password_async(password, stored_hash):
+            # Upgrade hashes made with older parameters, without holding up the login
+            if needs_rehash(stored_hash):
+                scheduler.submit(
+                    "password-rehash",
+                    lambda: rehash_password(username, password, stored_hash),
+                    timeout=REHASH_TIMEOUT_SECONDS
+                )
             return {"username": username, "role": role}
         return None
     
@@ -67,8 +172,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    """Get current user from token (backward compatible - returns username string)"""
+def _decode_token(token: str, scope: Optional[str] = None) -> dict:
+    """Claims of a valid token issued for `scope` (None for the regular access token)"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -76,29 +181,42 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     )
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
     except JWTError:
         raise credentials_exception
-    return username
+    # A single-purpose token must not pass as an access token, nor the other way round
+    if payload.get("sub") is None or payload.get("scope") != scope:
+        raise credentials_exception
+    return payload
+
+def create_stream_token(user: dict) -> str:
+    """Short-lived token that only opens the admin event stream"""
+    return create_access_token(
+        {"sub": user["username"], "role": user["role"], "scope": STREAM_TOKEN_SCOPE},
+        expires_delta=timedelta(seconds=settings.EVENTS_STREAM_TOKEN_SECONDS)
+    )
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    """Get current user from token (backward compatible - returns username string)"""
+    return _decode_token(token)["sub"]
 
 async def get_current_user_with_role(token: str = Depends(oauth2_scheme)):
     """Get current user with role from token"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        role: str = payload.get("role", "admin")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    return {"username": username, "role": role}
+    payload = _decode_token(token)
+    return {"username": payload["sub"], "role": payload.get("role", "admin")}
+
+async def get_current_user_for_stream(request: Request, token: Optional[str] = Depends(oauth2_scheme_optional)):
+    """Like get_current_user_with_role, but also accepts ?stream_token= since EventSource cannot send headers"""
+    if token:
+        return await get_current_user_with_role(token)
+    stream_token = request.query_params.get("stream_token")
+    if not stream_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    payload = _decode_token(stream_token, STREAM_TOKEN_SCOPE)
+    return {"username": payload["sub"], "role": payload.get("role", "admin")}
 
 async def require_superadmin(current_user: dict = Depends(get_current_user_with_role)):
     """Dependency that requires superadmin role"""
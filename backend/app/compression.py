@@ -0,0 +1,318 @@
+"""
+Compression Module for BiosciZone
+Negotiates zstd/brotli/gzip response compression and caches compressed bodies by ETag
+"""
+
+import gzip
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# Server preference when the client accepts several encodings equally
+PREFERRED_ENCODINGS = [name for name, module in (("zstd", zstandard), ("br", brotli), ("gzip", gzip)) if module]
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/xml",
+    "application/rss+xml",
+    "application/atom+xml",
+    "application/javascript",
+    "image/svg+xml",
+)
+
+# Bodies larger than this are compressed in a worker thread instead of on the event loop
+OFFLOAD_THRESHOLD = 64 * 1024
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class _StreamCompressor:
+    """Incremental compressor that flushes after every chunk so streamed data is not held back"""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._obj = brotli.Compressor(quality=level)
+        elif encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "gzip":
+            return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == "br":
+            return self._obj.process(data) + self._obj.flush()
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._obj.process(data) + self._obj.finish()
+        return self._obj.compress(data) + self._obj.flush()
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported encoding from an Accept-Encoding header"""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip()] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for name in PREFERRED_ENCODINGS:
+        q = weights.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Compare an If-None-Match header with an ETag
+
+    Compressed variants carry the encoding as a suffix (`"abc-gzip"`), so the
+    suffix is ignored when comparing.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    base = etag.strip('"')
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        candidate = candidate.strip('"')
+        if candidate == base or candidate.rsplit("-", 1)[0] == base:
+            return True
+    return False
+
+
+def is_compressible(message: Message) -> bool:
+    """Whether a response start message describes a body this middleware may compress"""
+    headers = Headers(raw=message["headers"])
+    if message["status"] < 200 or message["status"] in (204, 206, 304):
+        return False
+    if "content-encoding" in headers or "content-range" in headers:
+        return False
+    # Stored files serve byte ranges of what is on disk, and HEAD reports that length;
+    # compressing them would break both, so they are sent as stored
+    if headers.get("accept-ranges") == "bytes":
+        return False
+    content_type = headers.get("content-type", "")
+    if content_type.startswith("text/event-stream"):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressedCache:
+    """LRU of compressed bodies keyed by (ETag, encoding, level), bounded by total size"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str, int], bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str, int]) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Tuple[str, str, int], value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing text-like responses
+
+    Responses that carry a strong ETag are compressed once per (ETag, encoding,
+    level) and served from `cache` afterwards. Streaming responses are compressed
+    chunk by chunk. `route_levels` maps a path prefix to per-encoding levels;
+    a level of 0 disables compression for that route.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        levels: Optional[Dict[str, int]] = None,
+        route_levels: Optional[Dict[str, Dict[str, int]]] = None,
+        cache: Optional[CompressedCache] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": 6, "br": 5, "zstd": 3, **(levels or {})}
+        # Longest prefix first so the most specific route wins
+        self.route_levels = sorted((route_levels or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self.cache = cache
+
+    def level_for(self, path: str, encoding: str) -> int:
+        for prefix, levels in self.route_levels:
+            if path.startswith(prefix) and encoding in levels:
+                return levels[encoding]
+        return self.levels[encoding]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        level = self.level_for(scope["path"], encoding) if encoding else 0
+        if level <= 0:
+            async def send_uncompressed(message: Message) -> None:
+                # Another client may get this URL compressed, so caches must key on Accept-Encoding
+                if message["type"] == "http.response.start" and is_compressible(message):
+                    MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                await send(message)
+
+            await self.app(scope, receive, send_uncompressed)
+            return
+        responder = _CompressionResponder(self.app, encoding, level, self.minimum_size, self.cache)
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, level: int, minimum_size: int, cache: Optional[CompressedCache]):
+        self.app = app
+        self.encoding = encoding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.cache = cache
+        self.send: Send = None
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.compressor: Optional[_StreamCompressor] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _prepare_headers(self, content_length: Optional[int]) -> None:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        etag = headers.get("etag")
+        if etag and etag.endswith('"'):
+            # Each encoding is a different representation and needs its own tag
+            headers["ETag"] = f'{etag[:-1]}-{self.encoding}"'
+
+    async def _compress_whole(self, body: bytes) -> bytes:
+        etag = Headers(raw=self.start_message["headers"]).get("etag")
+        key = (etag, self.encoding, self.level) if etag and not etag.startswith("W/") and self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        if len(body) > OFFLOAD_THRESHOLD:
+            compressed = await anyio.to_thread.run_sync(compress, body, self.encoding, self.level)
+        else:
+            compressed = compress(body, self.encoding, self.level)
+        if key:
+            self.cache.put(key, compressed)
+        return compressed
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            self.passthrough = not is_compressible(message)
+            return
+
+        if self.start_message is not None and message_type != "http.response.body":
+            # e.g. file send extensions: never compressed
+            await self.send(self.start_message)
+            self.start_message = None
+            self.passthrough = True
+
+        if self.passthrough or message_type != "http.response.body":
+            if self.start_message is not None:
+                await self.send(self.start_message)
+                self.start_message = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            if not more_body:
+                if len(body) < self.minimum_size:
+                    MutableHeaders(raw=self.start_message["headers"]).add_vary_header("Accept-Encoding")
+                    await self.send(self.start_message)
+                    await self.send(message)
+                    self.start_message = None
+                    return
+                compressed = await self._compress_whole(body)
+                self._prepare_headers(len(compressed))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": compressed})
+                self.start_message = None
+                return
+            self.compressor = _StreamCompressor(self.encoding, self.level)
+            self._prepare_headers(None)
+            await self.send(self.start_message)
+            self.start_message = None
+
+        if more_body:
+            await self.send({"type": "http.response.body", "body": self.compressor.chunk(body), "more_body": True})
+        else:
+            await self.send({"type": "http.response.body", "body": self.compressor.finish(body)})
@@ -1,9 +1,29 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     TURSO_DATABASE_URL: str
     TURSO_AUTH_TOKEN: str
+    # Threads dedicated to blocking libsql calls (caps in-flight statements, not requests)
+    DB_EXECUTOR_WORKERS: int = 128
+    # How long a request waits on a shared (coalesced) read before giving up with 503
+    SINGLEFLIGHT_TIMEOUT_SECONDS: float = 10.0
+    # Uploaded attachments (defaults to backend/storage); files are stored by SHA-256
+    ATTACHMENT_STORAGE_DIR: Optional[str] = None
+    ATTACHMENT_MAX_BYTES: int = 50 * 1024 * 1024
+    # Admin live updates (SSE): events kept for Last-Event-ID resume, per-client buffer
+    EVENTS_HISTORY_SIZE: int = 1000
+    EVENTS_CLIENT_BUFFER: int = 256
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    EVENTS_RETRY_MS: int = 5000
+    # Lifetime of the single-purpose token that opens the stream (it is sent in the URL)
+    EVENTS_STREAM_TOKEN_SECONDS: int = 60
+    # State every worker must agree on (login lockouts, cache versions):
+    # "local" (per process, fine for one worker), "redis" or "package.module:ClassName"
+    SHARED_STATE_BACKEND: str = "local"
+    SHARED_STATE_REDIS_URL: Optional[str] = None
+    # DB connections opened at startup, before the worker accepts traffic
+    STARTUP_WARM_CONNECTIONS: int = 4
     JWT_SECRET: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
@@ -18,6 +38,78 @@ class Settings(BaseSettings):
     SMTP_USER: Optional[str] = None
     SMTP_PASSWORD: Optional[str] = None
     SMTP_FROM_NAME: str = "BIOSCIZONE"
+    # Rate limiting per client IP, written as "<count>/<second|minute|hour|day>"
+    RATE_LIMIT_ENABLED: bool = True
+    # Bucket storage: "memory" (per process), "redis" (shared; defaults to SHARED_STATE_REDIS_URL) or "package.module:ClassName"
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    # Only enable when running behind a proxy that sets X-Forwarded-For (e.g. Render)
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+    # Proxies in front of the app that append to X-Forwarded-For; the client is the entry added by the outermost one
+    RATE_LIMIT_TRUSTED_PROXY_HOPS: int = 1
+    RATE_LIMIT_BUDDY_SUBMIT: str = "5/minute"
+    RATE_LIMIT_FEEDBACK: str = "5/minute"
+    RATE_LIMIT_LOGIN: str = "10/minute"
+    # Public form intake: identical submissions within the window are rejected;
+    # Idempotency-Key responses are replayed for the TTL
+    DUPLICATE_WINDOW_MINUTES: int = 1440
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86400
+    # Article bodies are stored compressed ("zstd" or "zlib"); lists only carry a plain-text excerpt
+    ARTICLE_BODY_COMPRESSION: str = "zstd"
+    ARTICLE_BODY_COMPRESSION_LEVEL: int = 9
+    ARTICLE_EXCERPT_LENGTH: int = 300
+    # Article views are counted in memory and written in one batched upsert every N seconds
+    VIEW_COUNTER_FLUSH_SECONDS: float = 30.0
+    # A view's weight in the popularity score halves every half-life; changing it skews existing scores
+    POPULARITY_HALF_LIFE_HOURS: float = 72.0
+    # Most-read articles kept in memory per category for /api/articles/popular
+    POPULAR_ARTICLES_PER_CATEGORY: int = 20
+    # Public frontend origin, used for links in feeds and the sitemap
+    PUBLIC_SITE_URL: str = "http://localhost:5173"
+    # Feeds and sitemap are rebuilt after article writes, and at least this often
+    # (bounds staleness when workers do not share state); also their Cache-Control max-age
+    FEEDS_MAX_AGE_SECONDS: int = 300
+    # Newest articles per feed
+    FEED_ITEMS: int = 50
+    # Background jobs. Cron times are in SCHEDULER_TIMEZONE and kept to off-peak hours; "" disables a job
+    SCHEDULER_TIMEZONE: str = "Asia/Ho_Chi_Minh"
+    MAINTENANCE_PURGE_CRON: str = "15 3 * * *"
+    MAINTENANCE_OPTIMIZE_CRON: str = "45 3 * * 0"
+    MAINTENANCE_JOB_TIMEOUT_SECONDS: float = 600.0
+    AUDIT_LOG_RETENTION_DAYS: int = 365
+    READ_FEEDBACK_RETENTION_DAYS: int = 180
+    # Workers wait a random 0..N seconds before claiming a due job
+    SCHEDULER_JITTER_SECONDS: float = 30.0
+    # A maintenance run missed by more than this (e.g. while the app was down) waits for the next slot
+    SCHEDULER_MISFIRE_GRACE_MINUTES: float = 30.0
+    # Running jobs and background tasks get this long to finish at shutdown
+    SCHEDULER_SHUTDOWN_GRACE_SECONDS: float = 10.0
+    # Progressive lockout: lock after N failed logins, doubling from base up to max seconds
+    LOGIN_LOCKOUT_THRESHOLD: int = 5
+    LOGIN_LOCKOUT_BASE_SECONDS: int = 30
+    LOGIN_LOCKOUT_MAX_SECONDS: int = 3600
+    # Argon2id cost for new hashes (memory in KiB); older hashes are upgraded on their next login.
+    # `python -m backend.app.argon2_calibration` prints values for the current host
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+    # Use the cost calibrated for this host instead: the largest within the target (memory between
+    # the bounds), measured once when none is stored and kept in system_settings for all workers.
+    # Re-calibrate with `python -m backend.app.argon2_calibration --save`
+    ARGON2_CALIBRATE_ON_STARTUP: bool = False
+    ARGON2_TARGET_MS: float = 100.0
+    ARGON2_MIN_MEMORY_COST: int = 19456
+    ARGON2_MAX_MEMORY_COST: int = 65536
+    # Response compression, negotiated from Accept-Encoding (zstd, br, gzip)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_LEVEL: int = 5
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    # Per-route levels as JSON keyed by path prefix, e.g. {"/api/articles": {"br": 9, "gzip": 9}}; 0 disables
+    COMPRESSION_ROUTE_LEVELS: Dict[str, Dict[str, int]] = {}
+    # Compressed bodies are cached by ETag so each content version is compressed once
+    COMPRESSION_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding='utf-8')
 
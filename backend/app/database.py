@@ -1,33 +1,356 @@
+import asyncio
+import functools
 import libsql
 import pathlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Tuple, TypeVar, Union
+from .article_content import decode_body, encode_body, make_excerpt, plain_text
 from .config import settings
 
 # Path to schema.sql relative to this file
 SCHEMA_PATH = pathlib.Path(__file__).parent / "schema.sql"
 
-def get_db():
-    conn = libsql.connect(
+T = TypeVar("T")
+
+# The libsql driver is blocking, so every call runs on this dedicated pool instead of
+# Starlette's shared thread pool. Request concurrency is bounded by the event loop;
+# this only caps how many statements are in flight at once.
+_executor = ThreadPoolExecutor(max_workers=settings.DB_EXECUTOR_WORKERS, thread_name_prefix="libsql")
+
+
+def connect() -> libsql.Connection:
+    return libsql.connect(
         settings.TURSO_DATABASE_URL,
         auth_token=settings.TURSO_AUTH_TOKEN
     )
+
+
+async def run_in_db_thread(fn: Callable[..., T], *args: Any) -> T:
+    """Run a blocking driver call on the DB executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args))
+
+
+class ResultSet:
+    """Rows of an executed statement, fetched on the DB thread so reads never block the loop"""
+
+    __slots__ = ("description", "rows", "rowcount", "lastrowid", "_position")
+
+    def __init__(self, description, rows: List[Tuple], rowcount: int = -1, lastrowid: Optional[int] = None):
+        self.description = description
+        self.rows = rows
+        self.rowcount = rowcount
+        self.lastrowid = lastrowid
+        self._position = 0
+
+    def fetchone(self) -> Optional[Tuple]:
+        if self._position >= len(self.rows):
+            return None
+        row = self.rows[self._position]
+        self._position += 1
+        return row
+
+    def fetchall(self) -> List[Tuple]:
+        rows = self.rows[self._position:] if self._position else self.rows
+        self._position = len(self.rows)
+        return rows
+
+
+def _execute(conn: libsql.Connection, sql: str, params: Sequence[Any]) -> ResultSet:
+    cursor = conn.execute(sql, params)
+    rows = cursor.fetchall() if cursor.description else []
+    return ResultSet(cursor.description, rows, cursor.rowcount, cursor.lastrowid)
+
+
+class AsyncConnection:
+    """Async facade over a libsql connection; each call is offloaded to the DB executor"""
+
+    def __init__(self, conn: libsql.Connection):
+        self._conn = conn
+
+    @classmethod
+    async def open(cls) -> "AsyncConnection":
+        return cls(await run_in_db_thread(connect))
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> ResultSet:
+        return await run_in_db_thread(_execute, self._conn, sql, params)
+
+    async def executemany(self, sql: str, seq_of_params: Sequence[Sequence[Any]]) -> None:
+        await run_in_db_thread(self._conn.executemany, sql, seq_of_params)
+
+    async def commit(self) -> None:
+        await run_in_db_thread(self._conn.commit)
+
+    async def rollback(self) -> None:
+        await run_in_db_thread(self._conn.rollback)
+
+    async def close(self) -> None:
+        await run_in_db_thread(self._conn.close)
+
+    async def run(self, fn: Callable[[libsql.Connection], T]) -> T:
+        """Run several blocking statements in a single executor hop"""
+        return await run_in_db_thread(fn, self._conn)
+
+
+class _Statement(NamedTuple):
+    sql: str
+    params: Sequence[Any]
+    on_empty: Optional[BaseException]
+    on_rows: Optional[BaseException]
+
+
+class UnitOfWork:
+    """
+    Statements that succeed or fail together
+
+    Queued statements run inside one write transaction in a single hop to the DB
+    executor, instead of one hop (and possibly one commit) per statement. Use
+    `RETURNING` rather than re-selecting, and guards rather than existence SELECTs:
+    a guard checks how many rows a statement matched (rows returned, or changes()
+    for writes) and aborts the whole unit with the given exception.
+    """
+
+    def __init__(self, db: AsyncConnection):
+        self.db = db
+        self._statements: List[_Statement] = []
+
+    def add(self, sql: str, params: Sequence[Any] = (), *, on_empty: Optional[BaseException] = None,
+            on_rows: Optional[BaseException] = None) -> int:
+        """
+        Queue a statement and return the index of its result
+
+        Args:
+            on_empty: raised, rolling everything back, if the statement matches no rows
+            on_rows: raised, rolling everything back, if the statement matches any row
+        """
+        self._statements.append(_Statement(sql, params, on_empty, on_rows))
+        return len(self._statements) - 1
+
+    def _run(self, conn: libsql.Connection) -> List[ResultSet]:
+        results = []
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in self._statements:
+                rs = _execute(conn, statement.sql, statement.params)
+                matched = len(rs.rows) if rs.description else rs.rowcount
+                if statement.on_empty is not None and matched <= 0:
+                    raise statement.on_empty
+                if statement.on_rows is not None and matched > 0:
+                    raise statement.on_rows
+                results.append(rs)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return results
+
+    async def commit(self) -> List[ResultSet]:
+        """Run the queued statements and commit; results are in the order they were added"""
+        try:
+            return await self.db.run(self._run)
+        finally:
+            self._statements = []
+
+
+@asynccontextmanager
+async def db_connection():
+    """Connection for code outside of FastAPI dependency injection"""
+    conn = await AsyncConnection.open()
     try:
         yield conn
+    finally:
+        await conn.close()
+
+
+async def get_db():
+    async with db_connection() as conn:
+        yield conn
+
+
+def _ping() -> None:
+    conn = connect()
+    try:
+        conn.execute("SELECT 1").fetchall()
     finally:
         conn.close()
 
-def init_db():
-    conn = libsql.connect(
-        settings.TURSO_DATABASE_URL,
-        auth_token=settings.TURSO_AUTH_TOKEN
-    )
-    
-    # Create tables
+
+async def warm_up(connections: int) -> None:
+    """Start executor threads and complete the first driver connects before serving traffic"""
+    await asyncio.gather(*(run_in_db_thread(_ping) for _ in range(max(1, connections))))
+
+
+def shutdown_executor() -> None:
+    _executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _move_article_bodies(conn: libsql.Connection) -> None:
+    """Compress articles.content into article_bodies, fill excerpts and drop the column"""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(articles)").fetchall()]
+    if "content" not in columns:
+        return
+    bodies = []
+    excerpts = []
+    for article_id, content in conn.execute("SELECT id, content FROM articles WHERE content IS NOT NULL").fetchall():
+        encoding, body = encode_body(content)
+        bodies.append((article_id, encoding, body, len(content.encode("utf-8"))))
+        excerpts.append((make_excerpt(content), article_id))
+    if bodies:
+        conn.executemany(
+            "INSERT OR REPLACE INTO article_bodies (article_id, encoding, body, size) VALUES (?, ?, ?, ?)", bodies
+        )
+        conn.executemany("UPDATE articles SET excerpt = ? WHERE id = ?", excerpts)
+    conn.execute("ALTER TABLE articles DROP COLUMN content")
+
+
+def _index_article_bodies(conn: libsql.Connection) -> None:
+    """Fill article_search from the stored bodies"""
+    rows = [
+        (article_id, plain_text(decode_body(encoding, body)))
+        for article_id, encoding, body in conn.execute("SELECT article_id, encoding, body FROM article_bodies").fetchall()
+    ]
+    if rows:
+        conn.executemany("INSERT OR REPLACE INTO article_search (rowid, body) VALUES (?, ?)", rows)
+
+
+# How long a process waits for another one to finish migrating before giving up,
+# polling for the lock with a backoff that doubles up to the maximum
+MIGRATION_LOCK_TIMEOUT_SECONDS = 600
+MIGRATION_LOCK_RETRY_SECONDS = 0.1
+MIGRATION_LOCK_MAX_RETRY_SECONDS = 5.0
+
+# Changes to tables that already exist in deployed databases, applied in order after
+# schema.sql. Append only; schema.sql also declares new columns for fresh databases,
+# so adding a column that is already there is not an error. A step is SQL or a
+# function of the connection, for changes SQL alone cannot express.
+MIGRATIONS: List[List[Union[str, Callable[[libsql.Connection], None]]]] = [
+    # 1: duplicate-submission fingerprints
+    [
+        "ALTER TABLE bio_buddies ADD COLUMN fingerprint TEXT",
+        "ALTER TABLE bio_buddies ADD COLUMN topic_key TEXT",
+        "ALTER TABLE bio_buddies ADD COLUMN near_duplicate_of INTEGER",
+        "ALTER TABLE feedbacks ADD COLUMN fingerprint TEXT",
+        "CREATE INDEX IF NOT EXISTS idx_bio_buddies_fingerprint ON bio_buddies (fingerprint, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_bio_buddies_topic_key ON bio_buddies (topic_key)",
+        "CREATE INDEX IF NOT EXISTS idx_feedbacks_fingerprint ON feedbacks (fingerprint, created_at)",
+    ],
+    # 2: compressed article bodies
+    [
+        "ALTER TABLE articles ADD COLUMN excerpt TEXT",
+        "CREATE TABLE IF NOT EXISTS article_bodies (article_id INTEGER PRIMARY KEY, encoding TEXT NOT NULL, "
+        "body BLOB NOT NULL, size INTEGER NOT NULL)",
+        _move_article_bodies,
+    ],
+    # 3: article view counts
+    [
+        "CREATE TABLE IF NOT EXISTS article_stats (article_id INTEGER PRIMARY KEY, views INTEGER NOT NULL DEFAULT 0, "
+        "score REAL NOT NULL DEFAULT 0, score_epoch INTEGER NOT NULL DEFAULT 0, last_viewed_at DATETIME)",
+    ],
+    # 4: article edit times for feeds and the sitemap
+    [
+        "ALTER TABLE articles ADD COLUMN updated_at DATETIME",
+    ],
+    # 5: background job leases
+    [
+        "CREATE TABLE IF NOT EXISTS scheduler_jobs (name TEXT PRIMARY KEY, schedule TEXT NOT NULL, "
+        "next_run_at DATETIME NOT NULL, lease_owner TEXT, lease_until DATETIME, last_started_at DATETIME, "
+        "last_finished_at DATETIME, last_status TEXT, last_message TEXT, last_duration_ms INTEGER, "
+        "run_count INTEGER NOT NULL DEFAULT 0)",
+    ],
+    # 6: uploaded attachments, which databases created before them lack
+    [
+        "CREATE TABLE IF NOT EXISTS attachments (sha256 TEXT PRIMARY KEY, filename TEXT NOT NULL, "
+        "content_type TEXT NOT NULL, size INTEGER NOT NULL, has_preview INTEGER DEFAULT 0, uploaded_by TEXT, "
+        "created_at DATETIME DEFAULT CURRENT_TIMESTAMP)",
+    ],
+    # 7: full-text search over article bodies
+    [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS article_search USING fts5(body, content='', contentless_delete=1, "
+        "tokenize='unicode61 remove_diacritics 2')",
+        _index_article_bodies,
+    ],
+]
+
+
+def _lock_for_migration(conn: libsql.Connection) -> None:
+    """Take the database write lock, waiting out another process that is migrating"""
+    deadline = time.monotonic() + MIGRATION_LOCK_TIMEOUT_SECONDS
+    delay = MIGRATION_LOCK_RETRY_SECONDS
+    while True:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            return
+        except Exception as e:
+            remaining = deadline - time.monotonic()
+            if "locked" not in str(e) or remaining <= 0:
+                raise
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, MIGRATION_LOCK_MAX_RETRY_SECONDS)
+
+
+def _schema_statements() -> List[str]:
     with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
         schema = f.read()
-        # libsql's execute can run multiple statements if they are separated by ; 
-        # but let's be safe and split like before
-        for statement in schema.split(";"):
-            if statement.strip():
-                conn.execute(statement)
-    
-    conn.close()
+    # libsql's execute can run multiple statements if they are separated by ;
+    # but let's be safe and split like before
+    return [statement for statement in schema.split(";") if statement.strip()]
+
+
+def migrate(conn: libsql.Connection) -> None:
+    """
+    Create missing tables, then apply migrations newer than the version recorded in schema_migrations
+
+    schema.sql only creates what does not exist yet, so it gives a fresh database
+    every table and leaves existing ones for the migrations to change. Safe to
+    run from several processes at once: each version is applied in its own
+    write transaction, and the version is re-read after taking the lock, so a
+    step another process already applied is skipped rather than repeated.
+    """
+    _lock_for_migration(conn)
+    try:
+        for statement in _schema_statements():
+            conn.execute(statement)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations (version INTEGER PRIMARY KEY, applied_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+        )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    applied = conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations").fetchone()[0]
+    for version, statements in enumerate(MIGRATIONS[applied:], start=applied + 1):
+        _lock_for_migration(conn)
+        try:
+            if conn.execute("SELECT 1 FROM schema_migrations WHERE version >= ?", [version]).fetchone():
+                conn.rollback()
+                continue
+            for statement in statements:
+                if callable(statement):
+                    statement(conn)
+                    continue
+                try:
+                    conn.execute(statement)
+                except Exception as e:
+                    if "duplicate column name" not in str(e):
+                        raise
+            conn.execute("INSERT INTO schema_migrations (version) VALUES (?)", [version])
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+def migrate_db() -> None:
+    conn = connect()
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
+
+
+def init_db():
+    # Same path as start-up; kept for deployments that call /api/init-db
+    migrate_db()
@@ -0,0 +1,109 @@
+"""
+Deduplication Module for BiosciZone
+Submission fingerprints and Idempotency-Key handling for the public forms
+"""
+
+import hashlib
+import logging
+import re
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import orjson
+from fastapi import HTTPException, status
+
+from .config import settings
+from .shared_state import shared_state
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_PATTERN = re.compile(r"^[\x21-\x7e]{1,255}$")
+# A claimed key whose request never finished (worker died) is released after this
+IDEMPOTENCY_PENDING_TTL_SECONDS = 60
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Casefold, drop diacritics and punctuation, collapse whitespace"""
+    if not value:
+        return ""
+    # "đ" is a separate letter, not "d" plus a combining mark
+    value = unicodedata.normalize("NFKD", value.replace("đ", "d").replace("Đ", "D"))
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    return " ".join(_WORD_PATTERN.findall(value.casefold()))
+
+
+def fingerprint(*parts: Optional[str]) -> str:
+    """Stable hash of the normalized parts; equal for submissions that differ only in case, accents or spacing"""
+    joined = "\x1f".join(normalize_text(part) for part in parts)
+    return hashlib.blake2b(joined.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def duplicate_window() -> str:
+    """SQLite datetime() modifier for the start of the duplicate window"""
+    return f"-{settings.DUPLICATE_WINDOW_MINUTES} minutes"
+
+
+def duplicate_submission() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Duplicate submission: an identical request was already received"
+    )
+
+
+async def idempotent(scope: str, key: Optional[str], request_fingerprint: str,
+                     handler: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Run `handler` at most once per Idempotency-Key
+
+    A retry with the same key and payload gets the stored response back; the
+    same key with a different payload, or while the first request is still
+    running, is rejected. Without a key the handler simply runs.
+    """
+    if key is None:
+        return await handler()
+    if not IDEMPOTENCY_KEY_PATTERN.match(key):
+        raise HTTPException(status_code=400, detail="Invalid Idempotency-Key")
+
+    state_key = f"idempotency:{scope}:{key}"
+    try:
+        claimed = await shared_state.add(
+            state_key, orjson.dumps({"fingerprint": request_fingerprint}).decode(), ttl=IDEMPOTENCY_PENDING_TTL_SECONDS
+        )
+        stored = None if claimed else await shared_state.get(state_key)
+    except Exception as e:
+        # Fail open: content fingerprints still catch plain duplicates
+        logger.error(f"Idempotency store error: {e}")
+        return await handler()
+
+    if not claimed:
+        if stored is None:
+            # Expired between the two calls; the client can simply retry
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        record = orjson.loads(stored)
+        if record.get("fingerprint") != request_fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+        if "response" not in record:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        return record["response"]
+
+    try:
+        response = await handler()
+    except BaseException:
+        # Let the client retry with the same key
+        await _forget(state_key)
+        raise
+    record = {"fingerprint": request_fingerprint, "response": response}
+    try:
+        await shared_state.set(state_key, orjson.dumps(record).decode(), ttl=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+    except Exception as e:
+        logger.error(f"Idempotency store error: {e}")
+    return response
+
+
+async def _forget(state_key: str) -> None:
+    try:
+        await shared_state.delete(state_key)
+    except Exception as e:
+        logger.error(f"Idempotency store error: {e}")
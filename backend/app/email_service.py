@@ -3,16 +3,19 @@ Email Service Module for BiosciZone
 Handles sending email notifications via SMTP (Gmail)
 """
 
-import asyncio
 import logging
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import List, Optional
 
 from .config import settings
+from .scheduler import scheduler
 
 logger = logging.getLogger(__name__)
 
+# Upper bound for one background send, including the SMTP handshake
+EMAIL_SEND_TIMEOUT_SECONDS = 60.0
+
 
 def is_smtp_configured() -> bool:
     """Check if SMTP is properly configured"""
@@ -87,21 +90,16 @@ def send_email_background(
 ) -> None:
     """
     Send email in background (fire and forget)
-    This is used from synchronous context
+    Must be called from the event loop; the send runs as a tracked scheduler task
     """
     if not is_smtp_configured() or not to_emails:
         return
-    
-    try:
-        # Create new event loop for background task
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(
-            send_email_async(to_emails, subject, html_content, text_content)
-        )
-        loop.close()
-    except Exception as e:
-        logger.error(f"Background email failed: {str(e)}")
+
+    scheduler.submit(
+        "email",
+        lambda: send_email_async(to_emails, subject, html_content, text_content),
+        timeout=EMAIL_SEND_TIMEOUT_SECONDS
+    )
 
 
 def create_feedback_notification_email(
@@ -0,0 +1,205 @@
+"""
+Admin Events Module for BiosciZone
+Fans out change events to admin dashboards over Server-Sent Events
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set
+
+import orjson
+
+from .config import settings
+from .shared_state import shared_state
+
+logger = logging.getLogger(__name__)
+
+# Events only superadmins may see (the audit log is superadmin-only)
+SUPERADMIN_ONLY = "superadmin"
+ALL_ADMINS = "admin"
+
+# Shared-state channel carrying every worker's events to every other worker
+CHANNEL = "admin-events"
+RESUBSCRIBE_DELAY_SECONDS = 5.0
+
+
+class Event:
+    __slots__ = ("seq", "type", "data", "audience")
+
+    def __init__(self, seq: int, type: str, data: Dict[str, Any], audience: str):
+        self.seq = seq
+        self.type = type
+        self.data = data
+        self.audience = audience
+
+
+class Subscriber:
+    """One connected dashboard with its own bounded buffer"""
+
+    def __init__(self, role: str, buffer_size: int):
+        self.role = role
+        self.queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+    def can_see(self, event: Event) -> bool:
+        return event.audience == ALL_ADMINS or self.role == SUPERADMIN_ONLY
+
+    def offer(self, event: Event) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A slow client must not hold back the others
+            self.resync()
+
+    def resync(self) -> None:
+        """Drop the backlog and tell the client to refetch everything"""
+        if self.overflowed:
+            return
+        self.overflowed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class EventBroadcaster:
+    """
+    Fan-out of admin change events to the dashboards of every worker
+
+    Events are published on a shared-state channel and each worker delivers
+    what it receives to its own clients, so a dashboard sees writes handled by
+    any worker (with the local backend, only its own worker's). Recent events
+    are kept in a ring buffer so a reconnecting client can resume from its
+    Last-Event-ID. Event ids are "<epoch>-<seq>" and numbered per worker; the
+    epoch changes on every process start and whenever events may have been
+    missed, so ids from another worker or before a gap trigger a resync.
+    """
+
+    def __init__(self, history_size: int, client_buffer_size: int):
+        self.epoch = str(int(time.time() * 1000))
+        self.client_buffer_size = client_buffer_size
+        self._seq = 0
+        self._history: Deque[Event] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscriber] = set()
+        self._outbox: "asyncio.Queue[str]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    def event_id(self, event: Event) -> str:
+        return f"{self.epoch}-{event.seq}"
+
+    def publish(self, type: str, data: Dict[str, Any], audience: str = ALL_ADMINS) -> None:
+        """Queue an event for the clients of every worker; sent in order by a background task"""
+        self._outbox.put_nowait(orjson.dumps({"type": type, "data": data, "audience": audience}).decode())
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._send()), asyncio.create_task(self._receive())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _send(self) -> None:
+        while True:
+            message = await self._outbox.get()
+            try:
+                await shared_state.publish(CHANNEL, message)
+            except Exception as e:
+                logger.error(f"Admin event publish failed: {e}")
+                # Other workers miss it, but this worker's clients still get it
+                self._deliver(message)
+
+    async def _receive(self) -> None:
+        while True:
+            try:
+                async for message in shared_state.subscribe(CHANNEL):
+                    self._deliver(message)
+            except Exception as e:
+                logger.error(f"Admin event subscription failed: {e}")
+            # Whatever was published while unsubscribed is lost
+            self._reset()
+            await asyncio.sleep(RESUBSCRIBE_DELAY_SECONDS)
+
+    def _deliver(self, message: str) -> None:
+        """Record an event and push it to every connected client allowed to see it"""
+        payload = orjson.loads(message)
+        self._seq += 1
+        event = Event(self._seq, payload["type"], payload["data"], payload["audience"])
+        self._history.append(event)
+        for subscriber in self._subscribers:
+            if subscriber.can_see(event):
+                subscriber.offer(event)
+
+    def _reset(self) -> None:
+        # A new epoch makes ids handed out so far unresumable
+        self.epoch = str(int(time.time() * 1000))
+        self._history.clear()
+        for subscriber in self._subscribers:
+            subscriber.resync()
+
+    def _replay_from(self, last_event_id: Optional[str]):
+        """Events after `last_event_id`, or None if the gap can't be filled from history"""
+        if not last_event_id:
+            return []
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        if seq >= self._seq:
+            return []
+        if not self._history or self._history[0].seq > seq + 1:
+            return None
+        return [event for event in self._history if event.seq > seq]
+
+    def _format(self, event: Optional[Event]) -> bytes:
+        if event is None:
+            return b"event: resync\ndata: {}\n\n"
+        payload = orjson.dumps({"type": event.type, "data": event.data})
+        return b"id: " + self.event_id(event).encode() + b"\nevent: change\ndata: " + payload + b"\n\n"
+
+    async def stream(self, role: str, last_event_id: Optional[str]) -> AsyncIterator[bytes]:
+        """SSE byte stream for one client, starting after `last_event_id`"""
+        subscriber = Subscriber(role, self.client_buffer_size)
+        # Register and snapshot the backlog in one step (no await in between), so every
+        # event is either replayed or queued, never lost
+        self._subscribers.add(subscriber)
+        backlog = self._replay_from(last_event_id)
+        replayed = backlog[-1].seq if backlog else self._seq
+        try:
+            yield f"retry: {settings.EVENTS_RETRY_MS}\n\n".encode()
+            # Tells the client whether this stream carries every worker's changes or it must keep refetching
+            yield b"event: ready\ndata: " + orjson.dumps({"complete": shared_state.cluster_wide}) + b"\n\n"
+            if backlog is None:
+                yield self._format(None)
+            else:
+                for event in backlog:
+                    if subscriber.can_see(event):
+                        yield self._format(event)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), settings.EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield b": ping\n\n"
+                    continue
+                if event is None:
+                    yield self._format(None)
+                    subscriber.overflowed = False
+                    continue
+                if event.seq <= replayed:
+                    continue
+                yield self._format(event)
+        finally:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+broadcaster = EventBroadcaster(settings.EVENTS_HISTORY_SIZE, settings.EVENTS_CLIENT_BUFFER)
@@ -0,0 +1,258 @@
+"""
+Feeds Module for BiosciZone
+RSS/Atom feeds per article category and the sitemap, served from memory
+"""
+
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .compression import etag_matches
+from .config import settings
+from .database import db_connection
+from .serialization import json_etag
+from .shared_state import shared_state
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+FEED_FORMATS = {
+    "rss": "application/rss+xml; charset=utf-8",
+    "atom": "application/atom+xml; charset=utf-8",
+}
+SITEMAP_CONTENT_TYPE = "application/xml; charset=utf-8"
+
+# Frontend pages; article categories map to the page that lists them and its title
+STATIC_PAGES = ["/", "/bio-match", "/science-corner", "/bio-magazine", "/achievements", "/resources", "/contact"]
+CATEGORY_PAGES = {
+    "bio_info": ("/bio-match", "Bio-Information"),
+    "magazine": ("/bio-magazine", "Bio-Magazine"),
+    "science_corner": ("/science-corner", "Science Corner"),
+    "achievement": ("/achievements", "Thành tích"),
+    "resource": ("/resources", "Tài nguyên"),
+}
+# Key of the feed covering every category
+ALL_CATEGORIES = "all"
+
+# Bumped by admin article writes; every worker rebuilds when it sees a new value
+VERSION_KEY = "feeds:version"
+
+FEED_QUERY = (
+    "SELECT id, category, title, excerpt, author, created_at, COALESCE(updated_at, created_at) AS updated_at "
+    "FROM articles ORDER BY created_at DESC, id DESC"
+)
+
+FeedRow = Tuple[int, str, str, Optional[str], Optional[str], str, str]
+
+
+class Document(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: datetime
+    content_type: str
+
+
+def _parse_timestamp(value: str) -> datetime:
+    # SQLite CURRENT_TIMESTAMP is UTC without an offset
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+
+def _iso(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def article_url(article_id: int) -> str:
+    return f"{settings.PUBLIC_SITE_URL.rstrip('/')}/article/{article_id}"
+
+
+def page_url(path: str) -> str:
+    return f"{settings.PUBLIC_SITE_URL.rstrip('/')}{path}"
+
+
+def _rss_item(row: FeedRow) -> str:
+    article_id, _, title, excerpt, author, created_at, _ = row
+    url = article_url(article_id)
+    parts = [
+        f"<item><title>{escape(title)}</title><link>{escape(url)}</link>",
+        f"<guid isPermaLink=\"true\">{escape(url)}</guid>",
+        f"<pubDate>{format_datetime(_parse_timestamp(created_at), usegmt=True)}</pubDate>",
+    ]
+    if author:
+        parts.append(f"<dc:creator>{escape(author)}</dc:creator>")
+    if excerpt:
+        parts.append(f"<description>{escape(excerpt)}</description>")
+    parts.append("</item>")
+    return "".join(parts)
+
+
+def _atom_entry(row: FeedRow) -> str:
+    article_id, _, title, excerpt, author, created_at, updated_at = row
+    url = article_url(article_id)
+    parts = [
+        f"<entry><title>{escape(title)}</title><link href={quoteattr(url)}/><id>{escape(url)}</id>",
+        f"<published>{_iso(_parse_timestamp(created_at))}</published>",
+        f"<updated>{_iso(_parse_timestamp(updated_at))}</updated>",
+    ]
+    if author:
+        parts.append(f"<author><name>{escape(author)}</name></author>")
+    if excerpt:
+        parts.append(f"<summary>{escape(excerpt)}</summary>")
+    parts.append("</entry>")
+    return "".join(parts)
+
+
+def _sitemap_url(row: FeedRow) -> str:
+    return f"<url><loc>{escape(article_url(row[0]))}</loc><lastmod>{_iso(_parse_timestamp(row[6]))}</lastmod></url>"
+
+
+RENDERERS = {"rss": _rss_item, "atom": _atom_entry, "sitemap": _sitemap_url}
+
+
+class FeedCache:
+    """
+    Feeds and sitemap rendered once per content version
+
+    Every document is rebuilt from a single bodiless query over articles when an
+    admin write bumps the shared version (or, as a fallback for workers that
+    cannot see each other's version, after FEEDS_MAX_AGE_SECONDS). Rendered item
+    fragments are keyed by their row and reused across rebuilds, so a rebuild
+    only renders the articles that changed. Requests in between are answered
+    from memory, with conditional GET against the stored ETag and Last-Modified.
+    """
+
+    def __init__(self):
+        self._documents: Dict[Tuple[str, str], Document] = {}
+        self._fragments: Dict[Tuple[str, FeedRow], str] = {}
+        self._version: Optional[str] = None
+        self._built_at = 0.0
+        self._flights = SingleFlight()
+
+    async def invalidate(self) -> None:
+        """Mark every worker's feeds stale after an article write"""
+        self._version = None
+        try:
+            await shared_state.incr(VERSION_KEY)
+        except Exception as e:
+            logger.error(f"Feed version bump failed: {e}")
+
+    async def get(self, kind: str, category: str) -> Optional[Document]:
+        try:
+            version = await shared_state.get(VERSION_KEY) or "0"
+        except Exception as e:
+            # Keep serving what we have; the max age still bounds staleness
+            logger.error(f"Feed version read failed: {e}")
+            version = self._version
+        expired = time.monotonic() - self._built_at > settings.FEEDS_MAX_AGE_SECONDS
+        if version is None or version != self._version or expired:
+            await self._flights.do("rebuild", lambda: self._rebuild(version))
+        return self._documents.get((kind, category))
+
+    async def _rebuild(self, version: Optional[str]) -> None:
+        # The version is read before the query, so a write racing the rebuild triggers another one
+        async with db_connection() as db:
+            rs = await db.execute(FEED_QUERY)
+        rows: List[FeedRow] = [tuple(row) for row in rs.fetchall()]
+
+        fragments: Dict[Tuple[str, FeedRow], str] = {}
+
+        def render(kind: str, row: FeedRow) -> str:
+            key = (kind, row)
+            fragment = fragments.get(key) or self._fragments.get(key)
+            if fragment is None:
+                fragment = RENDERERS[kind](row)
+            fragments[key] = fragment
+            return fragment
+
+        by_category: Dict[str, List[FeedRow]] = {category: [] for category in (ALL_CATEGORIES, *CATEGORY_PAGES)}
+        for row in rows:
+            for category in (row[1], ALL_CATEGORIES):
+                items = by_category.setdefault(category, [])
+                if len(items) < settings.FEED_ITEMS:
+                    items.append(row)
+
+        documents: Dict[Tuple[str, str], Document] = {}
+        for category, items in by_category.items():
+            for kind in FEED_FORMATS:
+                body = self._render_feed(kind, category, items, render)
+                documents[(kind, category)] = self._document(kind, category, body, FEED_FORMATS[kind])
+        sitemap = self._render_sitemap(rows, render)
+        documents[("sitemap", ALL_CATEGORIES)] = self._document("sitemap", ALL_CATEGORIES, sitemap, SITEMAP_CONTENT_TYPE)
+
+        self._documents = documents
+        self._fragments = fragments
+        self._version = version
+        self._built_at = time.monotonic()
+
+    def _document(self, kind: str, category: str, body: str, content_type: str) -> Document:
+        encoded = body.encode("utf-8")
+        etag = json_etag(encoded)
+        previous = self._documents.get((kind, category))
+        # Last-Modified is when this worker first saw the current content; it only moves when the body changes
+        if previous is not None and previous.etag == etag:
+            last_modified = previous.last_modified
+        else:
+            last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        return Document(encoded, etag, last_modified, content_type)
+
+    def _render_feed(self, kind: str, category: str, items: List[FeedRow], render) -> str:
+        path, label = CATEGORY_PAGES.get(category, ("/", category))
+        title = escape("BiosciZone" if category == ALL_CATEGORIES else f"BiosciZone - {label}")
+        link = page_url(path)
+        updated = max((_parse_timestamp(row[6]) for row in items), default=datetime.now(timezone.utc))
+        entries = "".join(render(kind, row) for row in items)
+        if kind == "rss":
+            return (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/"><channel>'
+                f"<title>{title}</title><link>{escape(link)}</link><description>{title}</description>"
+                f"<lastBuildDate>{format_datetime(updated, usegmt=True)}</lastBuildDate>"
+                f"{entries}</channel></rss>"
+            )
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<feed xmlns="http://www.w3.org/2005/Atom">'
+            f"<title>{title}</title><link href={quoteattr(link)}/><id>{escape(link)}</id>"
+            f"<updated>{_iso(updated)}</updated>"
+            f"{entries}</feed>"
+        )
+
+    def _render_sitemap(self, rows: List[FeedRow], render) -> str:
+        pages = "".join(f"<url><loc>{escape(page_url(path))}</loc></url>" for path in STATIC_PAGES)
+        articles = "".join(render("sitemap", row) for row in rows)
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            f"{pages}{articles}</urlset>"
+        )
+
+
+def document_response(request: Request, document: Document) -> Response:
+    """Serve a document, or 304 when the client's copy is current"""
+    headers = {
+        "ETag": document.etag,
+        "Last-Modified": format_datetime(document.last_modified, usegmt=True),
+        "Cache-Control": f"public, max-age={settings.FEEDS_MAX_AGE_SECONDS}",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = etag_matches(if_none_match, document.etag)
+    else:
+        not_modified = False
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                not_modified = document.last_modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                pass
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return Response(document.body, media_type=document.content_type, headers=headers)
+
+
+feed_cache = FeedCache()
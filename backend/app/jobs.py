@@ -0,0 +1,76 @@
+"""
+Maintenance Jobs Module for BiosciZone
+Periodic clean-up and upkeep, registered with the scheduler at start-up
+"""
+
+from typing import List
+
+from .config import settings
+from .database import db_connection
+from .scheduler import Cron, Interval, Job
+from .view_counter import view_counter
+
+# Rows deleted per statement, so a purge never holds the write lock for long
+PURGE_BATCH_ROWS = 1000
+
+
+async def _purge(table: str, condition: str, params: list) -> int:
+    deleted = 0
+    async with db_connection() as db:
+        while True:
+            rs = await db.execute(
+                f"DELETE FROM {table} WHERE id IN (SELECT id FROM {table} WHERE {condition} LIMIT {PURGE_BATCH_ROWS})",
+                params
+            )
+            await db.commit()
+            deleted += max(rs.rowcount, 0)
+            if rs.rowcount < PURGE_BATCH_ROWS:
+                return deleted
+
+
+async def purge_audit_logs() -> str:
+    deleted = await _purge(
+        "audit_logs", "created_at < datetime('now', ?)", [f"-{settings.AUDIT_LOG_RETENTION_DAYS} days"]
+    )
+    return f"Deleted {deleted} audit log(s) older than {settings.AUDIT_LOG_RETENTION_DAYS} days"
+
+
+async def purge_read_feedbacks() -> str:
+    deleted = await _purge(
+        "feedbacks", "is_read = 1 AND created_at < datetime('now', ?)", [f"-{settings.READ_FEEDBACK_RETENTION_DAYS} days"]
+    )
+    return f"Deleted {deleted} read feedback(s) older than {settings.READ_FEEDBACK_RETENTION_DAYS} days"
+
+
+def _is_remote_database() -> bool:
+    return settings.TURSO_DATABASE_URL.startswith(("libsql://", "https://", "http://", "wss://", "ws://"))
+
+
+async def optimize_database() -> str:
+    async with db_connection() as db:
+        await db.execute("ANALYZE")
+        # Turso manages storage of remote databases itself; VACUUM only applies to local files
+        if _is_remote_database():
+            return "Analyzed"
+        await db.execute("VACUUM")
+    return "Analyzed and vacuumed"
+
+
+def maintenance_jobs() -> List[Job]:
+    """Jobs for this deployment; a maintenance job with an empty cron setting is disabled"""
+    jobs = [
+        # Every worker buffers its own views, so each one flushes them
+        Job("view_counter_flush", Interval(settings.VIEW_COUNTER_FLUSH_SECONDS, immediate=True), view_counter.flush,
+            timeout=settings.VIEW_COUNTER_FLUSH_SECONDS, leader=False),
+    ]
+    cron_jobs = [
+        ("purge_audit_logs", settings.MAINTENANCE_PURGE_CRON, purge_audit_logs),
+        ("purge_read_feedbacks", settings.MAINTENANCE_PURGE_CRON, purge_read_feedbacks),
+        ("optimize_database", settings.MAINTENANCE_OPTIMIZE_CRON, optimize_database),
+    ]
+    for name, expression, fn in cron_jobs:
+        if expression:
+            jobs.append(Job(name, Cron(expression), fn, timeout=settings.MAINTENANCE_JOB_TIMEOUT_SECONDS,
+                            jitter=settings.SCHEDULER_JITTER_SECONDS,
+                            misfire_grace=settings.SCHEDULER_MISFIRE_GRACE_MINUTES * 60))
+    return jobs
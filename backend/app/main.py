@@ -1,10 +1,57 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+from functools import partial
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import public, admin
-from .database import init_db
+from .compression import CompressedCache, CompressionMiddleware
+from .database import init_db, migrate_db, run_in_db_thread, shutdown_executor, warm_up
 from .config import settings
+from .events import broadcaster
+from . import auth, rate_limit
+from .shared_state import shared_state
+from .jobs import maintenance_jobs
+from .scheduler import scheduler
+from .view_counter import view_counter
 
-app = FastAPI(title="BiosciZone API", version="1.0.0")
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs in each worker after fork and before it accepts connections, so the
+    # first request does not pay for thread start-up and the initial DB connect
+    started = time.perf_counter()
+    try:
+        await warm_up(settings.STARTUP_WARM_CONNECTIONS)
+    except Exception as e:
+        logger.error(f"Database warm-up failed: {e}")
+    # Create missing tables and bring existing ones up to date.
+    # Under gunicorn the master has already migrated and this only confirms it;
+    # a failure stops the worker rather than serving against a half-migrated schema
+    await run_in_db_thread(migrate_db)
+    logger.info(f"Worker warmed up in {(time.perf_counter() - started) * 1000:.0f} ms")
+    for job in maintenance_jobs():
+        scheduler.add(job)
+    scheduler.start()
+    broadcaster.start()
+    if settings.ARGON2_CALIBRATE_ON_STARTUP and not await auth.use_calibrated_hasher():
+        # Nothing stored yet (under gunicorn the master calibrates first): measure in the
+        # background and use the configured cost until then
+        scheduler.submit(
+            "argon2-calibration", partial(auth.use_calibrated_hasher, True), timeout=auth.CALIBRATION_TIMEOUT_SECONDS
+        )
+    yield
+    await scheduler.stop()
+    await broadcaster.stop()
+    await view_counter.close()
+    await rate_limit.backend.close()
+    await shared_state.close()
+    shutdown_executor()
+
+
+app = FastAPI(title="BiosciZone API", version="1.0.0", lifespan=lifespan)
 
 # CORS Configuration - origins read from environment variable
 origins = [origin.strip() for origin in settings.CORS_ORIGINS.split(",")]
@@ -17,6 +64,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        levels={
+            "gzip": settings.COMPRESSION_GZIP_LEVEL,
+            "br": settings.COMPRESSION_BROTLI_LEVEL,
+            "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+        },
+        route_levels=settings.COMPRESSION_ROUTE_LEVELS,
+        cache=CompressedCache(settings.COMPRESSION_CACHE_MAX_BYTES),
+    )
+
 # Root endpoint
 @app.get("/")
 def read_root():
@@ -28,9 +88,9 @@ app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 # Command to initialize DB schema
 @app.post("/api/init-db", tags=["System"])
-def initialize_database():
+async def initialize_database():
     try:
-        init_db()
+        await run_in_db_thread(init_db)
         return {"message": "Database tables created successfully"}
     except Exception as e:
         return {"error": str(e)}
@@ -33,6 +33,10 @@ class BioBuddyResponse(BioBuddyBase):
     class Config:
         from_attributes = True
 
+class BioBuddyAdminResponse(BioBuddyResponse):
+    # Earlier submission from the same email on the same (normalized) topic
+    near_duplicate_of: Optional[int] = None
+
 # Article Models
 class ArticleBase(BaseModel):
     category: str
@@ -57,11 +61,41 @@ class ArticleUpdate(BaseModel):
 
 class ArticleResponse(ArticleBase):
     id: int
+    excerpt: Optional[str] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
 
+class ArticleSummaryResponse(BaseModel):
+    """Article in list views: the excerpt instead of the full body"""
+    id: int
+    category: str
+    title: str
+    excerpt: Optional[str] = None
+    author: Optional[str] = None
+    external_link: Optional[str] = None
+    file_url: Optional[str] = None
+    publication_date: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class PopularArticleResponse(ArticleSummaryResponse):
+    views: int
+    # Views weighted by recency: each one counts half as much per half-life
+    score: float
+
+# Attachment Models
+class AttachmentInfo(BaseModel):
+    sha256: str
+    filename: str
+    content_type: str
+    size: int
+    url: str
+    preview_url: str
+
 # Feedback Model
 class FeedbackCreate(BaseModel):
     sender_name: str
@@ -124,3 +158,17 @@ class AuditLogResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+# Scheduler / Job Models (Superadmin)
+class JobStatusResponse(BaseModel):
+    name: str
+    schedule: str
+    scope: str  # cluster: runs on one worker at a time; worker: runs in every worker
+    next_run_at: Optional[datetime] = None
+    running: bool = False
+    last_started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    last_status: Optional[str] = None
+    last_message: Optional[str] = None
+    last_duration_ms: Optional[int] = None
+    run_count: int = 0
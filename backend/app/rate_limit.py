@@ -0,0 +1,233 @@
+"""
+Rate Limiting Module for BiosciZone
+Token-bucket limits per client IP and route, plus progressive lockout for failed logins
+"""
+
+import importlib
+import math
+import threading
+import time
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from .config import settings
+from .shared_state import SharedState, shared_state
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(rate: str) -> Tuple[int, float]:
+    """
+    Parse a rate string such as "5/minute" or "100/hour"
+
+    Returns:
+        Tuple of (bucket capacity, refill rate in tokens per second)
+    """
+    count, _, period = rate.partition("/")
+    period = period.strip().lower().rstrip("s")
+    if period not in _PERIODS or not count.strip().isdigit():
+        raise ValueError(f"Invalid rate limit '{rate}', expected '<count>/<second|minute|hour|day>'")
+    capacity = int(count)
+    return capacity, capacity / _PERIODS[period]
+
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets. Subclass this to plug in a shared store."""
+
+    @abstractmethod
+    async def consume(self, key: str, capacity: int, refill_rate: float, cost: float = 1) -> float:
+        """
+        Take `cost` tokens from the bucket at `key`
+
+        Returns:
+            0 if the request is allowed, otherwise seconds until enough tokens are available
+        """
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process token buckets. Idle buckets are swept once the table grows past max_keys."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}  # key -> (tokens, updated_at, full_at)
+        self._lock = threading.Lock()
+
+    async def consume(self, key: str, capacity: int, refill_rate: float, cost: float = 1) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            retry_after = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                retry_after = (cost - tokens) / refill_rate
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / refill_rate)
+            if len(self._buckets) > self.max_keys:
+                self._sweep(now)
+        return retry_after
+
+    def _sweep(self, now: float) -> None:
+        # A bucket that has refilled completely is indistinguishable from a new one
+        for key in [k for k, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+            del self._buckets[key]
+
+
+# Atomic token bucket in Redis; uses the server clock so all workers agree on time
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local retry = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    retry = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(retry)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Token buckets shared by all workers through Redis (requires the `redis` package)"""
+
+    def __init__(self, url: str, prefix: str = "bioscizone:ratelimit:"):
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package") from e
+        self.prefix = prefix
+        self._client = redis_asyncio.from_url(url)
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def consume(self, key: str, capacity: int, refill_rate: float, cost: float = 1) -> float:
+        result = await self._script(keys=[self.prefix + key], args=[capacity, refill_rate, cost])
+        return float(result)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_backend(name: str) -> RateLimitBackend:
+    """Build a backend from a name: "memory", "redis" or a "package.module:ClassName" path"""
+    if name == "memory":
+        return MemoryRateLimitBackend()
+    if name == "redis":
+        url = settings.RATE_LIMIT_REDIS_URL or settings.SHARED_STATE_REDIS_URL
+        if not url:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires RATE_LIMIT_REDIS_URL or SHARED_STATE_REDIS_URL")
+        return RedisRateLimitBackend(url)
+    module_name, _, class_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+backend = create_backend(settings.RATE_LIMIT_BACKEND)
+
+
+def get_client_ip(request: Request) -> str:
+    """Client IP, taken from X-Forwarded-For only when running behind a trusted proxy"""
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            # Each proxy appends the address it saw, so only the last N entries are trustworthy;
+            # anything left of them came from the client and could be anything
+            hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+            if hops:
+                return hops[max(len(hops) - settings.RATE_LIMIT_TRUSTED_PROXY_HOPS, 0)]
+    return request.client.host if request.client else "unknown"
+
+
+def too_many_requests(retry_after: float, detail: str = "Too many requests, please try again later") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def rate_limit(scope: str, rate: str):
+    """
+    Dependency factory enforcing `rate` per client IP for one route
+
+    Register it in the route decorator (`dependencies=[Depends(rate_limit(...))]`)
+    so it runs before the DB connection and request handler.
+    """
+    capacity, refill_rate = parse_rate(rate)
+
+    async def dependency(request: Request):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        key = f"{scope}:{get_client_ip(request)}"
+        try:
+            retry_after = await backend.consume(key, capacity, refill_rate)
+        except Exception as e:
+            # Fail open: an unavailable shared store must not take the site down
+            logger.error(f"Rate limit backend error: {e}")
+            return
+        if retry_after > 0:
+            raise too_many_requests(retry_after)
+
+    return dependency
+
+
+class LoginLockout:
+    """
+    Progressive lockout for failed logins
+
+    After LOGIN_LOCKOUT_THRESHOLD consecutive failures the key is locked for
+    LOGIN_LOCKOUT_BASE_SECONDS, doubling with every further failure up to
+    LOGIN_LOCKOUT_MAX_SECONDS. A successful login clears the record. State lives
+    in the shared store so every worker enforces the same lock.
+    """
+
+    def __init__(self, state: SharedState, prefix: str = "lockout:"):
+        self.state = state
+        self.prefix = prefix
+
+    async def retry_after(self, key: str) -> float:
+        try:
+            locked_until = await self.state.get(f"{self.prefix}{key}:until")
+        except Exception as e:
+            logger.error(f"Login lockout backend error: {e}")
+            return 0.0
+        if not locked_until:
+            return 0.0
+        return max(0.0, float(locked_until) - time.time())
+
+    async def record_failure(self, key: str) -> None:
+        try:
+            # Failures are forgotten once the maximum lock window passes quietly
+            failures = await self.state.incr(f"{self.prefix}{key}:failures", ttl=settings.LOGIN_LOCKOUT_MAX_SECONDS)
+            if failures >= settings.LOGIN_LOCKOUT_THRESHOLD:
+                exponent = min(failures - settings.LOGIN_LOCKOUT_THRESHOLD, 32)
+                duration = min(settings.LOGIN_LOCKOUT_BASE_SECONDS * (2 ** exponent), settings.LOGIN_LOCKOUT_MAX_SECONDS)
+                # Wall-clock deadline so all workers read the same value
+                await self.state.set(f"{self.prefix}{key}:until", str(time.time() + duration), ttl=duration)
+        except Exception as e:
+            logger.error(f"Login lockout backend error: {e}")
+
+    async def reset(self, key: str) -> None:
+        try:
+            await self.state.delete(f"{self.prefix}{key}:failures")
+            await self.state.delete(f"{self.prefix}{key}:until")
+        except Exception as e:
+            logger.error(f"Login lockout backend error: {e}")
+
+
+login_lockout = LoginLockout(shared_state)
@@ -1,42 +1,93 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
-from typing import List
-import libsql
+from typing import List, Optional
 import uuid
 import json
-from ..database import get_db
+from ..article_content import ARTICLE_DETAIL_QUERY, encode_body, make_excerpt, plain_text, with_body
+from ..database import AsyncConnection, ResultSet, UnitOfWork, get_db
+from ..rate_limit import rate_limit, get_client_ip
+from ..serialization import RowEncoder, json_response, row_response, rows_response
+from ..storage import attachment_sha_from_url, detect_media_type, save_stream, schedule_preview
+from ..events import SUPERADMIN_ONLY, broadcaster
+from ..feeds import feed_cache
+from ..scheduler import scheduler
+from ..view_counter import view_counter
 from ..auth import (
     authenticate_user, 
     create_access_token, 
+    create_stream_token,
     get_current_user,
     get_current_user_with_role,
+    get_current_user_for_stream,
     require_superadmin,
-    get_password_hash,
+    get_password_hash_async,
     settings
 )
 from ..models import (
-    Token, BioBuddyResponse, ArticleCreate, ArticleUpdate, ArticleResponse,
+    Token, BioBuddyAdminResponse, ArticleCreate, ArticleUpdate, ArticleResponse, ArticleSummaryResponse,
     AdminCreate, AdminResponse, AdminUpdate,
     SystemSettingResponse, SystemSettingUpdate,
-    AuditLogResponse
+    AuditLogResponse, AttachmentInfo, JobStatusResponse
 )
 
 router = APIRouter()
 
-# Helper function to log audit events
-def log_audit(db: libsql.Connection, username: str, action: str, entity_type: str, entity_id: str = None, details: dict = None):
-    db.execute(
-        "INSERT INTO audit_logs (admin_username, action, entity_type, entity_id, details) VALUES (?, ?, ?, ?, ?)",
-        [username, action, entity_type, entity_id, json.dumps(details) if details else None]
+setting_encoder = RowEncoder(SystemSettingResponse)
+admin_encoder = RowEncoder(AdminResponse)
+audit_encoder = RowEncoder(AuditLogResponse)
+job_encoder = RowEncoder(JobStatusResponse)
+buddy_encoder = RowEncoder(BioBuddyAdminResponse)
+article_encoder = RowEncoder(ArticleResponse)
+article_summary_encoder = RowEncoder(ArticleSummaryResponse)
+# Feedbacks have no response_model, so rows are passed through as-is
+raw_encoder = RowEncoder()
+
+AUDIT_COLUMNS = "admin_username, action, entity_type, entity_id, details"
+
+def audit_details_json(details: dict) -> str:
+    # Same compact, unescaped form SQLite's json_object() produces for details read from rows
+    return json.dumps(details, ensure_ascii=False, separators=(",", ":"))
+
+# Helpers to record audit events in the same transaction as the change they describe
+def queue_audit(uow: UnitOfWork, username: str, action: str, entity_type: str, entity_id: str = None, details: dict = None) -> int:
+    return uow.add(
+        f"INSERT INTO audit_logs ({AUDIT_COLUMNS}) VALUES (?, ?, ?, ?, ?) RETURNING *",
+        [username, action, entity_type, entity_id, audit_details_json(details) if details else None]
     )
-    db.commit()
+
+def queue_audit_select(uow: UnitOfWork, username: str, action: str, entity_type: str, select: str, params: list, **guards) -> int:
+    """Audit entry whose (entity_id, details) come from `select`, so no separate read is needed; no row, no entry"""
+    return uow.add(
+        f"INSERT INTO audit_logs ({AUDIT_COLUMNS}) SELECT ?, ?, ?, e.* FROM ({select}) AS e RETURNING *",
+        [username, action, entity_type, *params],
+        **guards
+    )
+
+def publish_audit(rs: ResultSet):
+    for row in rs.rows:
+        broadcaster.publish("audit.created", audit_encoder.to_dict(rs.description, row), SUPERADMIN_ONLY)
+
+async def log_audit(db: AsyncConnection, username: str, action: str, entity_type: str, entity_id: str = None, details: dict = None):
+    uow = UnitOfWork(db)
+    audit = queue_audit(uow, username, action, entity_type, entity_id, details)
+    publish_audit((await uow.commit())[audit])
+
+def queue_attachment_check(uow: UnitOfWork, file_url: str = None):
+    """Reject article file links to local attachments that were never uploaded"""
+    sha256 = attachment_sha_from_url(file_url)
+    if sha256:
+        uow.add(
+            "SELECT 1 FROM attachments WHERE sha256 = ?", [sha256],
+            on_empty=HTTPException(status_code=400, detail="Attachment not found, upload the file first")
+        )
 
 # Authentication
-@router.post("/login", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: libsql.Connection = Depends(get_db)):
+@router.post("/login", response_model=Token, dependencies=[Depends(rate_limit("login", settings.RATE_LIMIT_LOGIN))])
+async def login_for_access_token(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncConnection = Depends(get_db)):
     # authenticate_user now returns dict with username and role
-    user = authenticate_user(form_data.username, form_data.password)
+    user = await authenticate_user(form_data.username, form_data.password, get_client_ip(request))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -49,9 +100,25 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
         data={"sub": user["username"], "role": user["role"]}, 
         expires_delta=access_token_expires
     )
-    log_audit(db, user["username"], "login", "session", None, {"role": user["role"]})
+    await log_audit(db, user["username"], "login", "session", None, {"role": user["role"]})
     return {"access_token": access_token, "token_type": "bearer"}
 
+# Live dashboard updates (Server-Sent Events)
+@router.post("/events/token")
+async def admin_events_token(current_user: dict = Depends(get_current_user_with_role)):
+    """Token for opening /events, which cannot carry the access token in a header"""
+    return {"stream_token": create_stream_token(current_user), "expires_in": settings.EVENTS_STREAM_TOKEN_SECONDS}
+
+@router.get("/events")
+async def admin_events(request: Request, current_user: dict = Depends(get_current_user_for_stream)):
+    # Browsers send Last-Event-ID on reconnect; the query param allows resuming after a page reload
+    last_event_id = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+    return StreamingResponse(
+        broadcaster.stream(current_user["role"], last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # Get current user info (for frontend to determine role)
 @router.get("/me")
 async def get_me(current_user: dict = Depends(get_current_user_with_role)):
@@ -59,14 +126,14 @@ async def get_me(current_user: dict = Depends(get_current_user_with_role)):
 
 # Seed initial admin or register new admin if enabled
 @router.post("/seed-admin")
-async def seed_admin(username: str, password: str, role: str = "admin", db: libsql.Connection = Depends(get_db)):
+async def seed_admin(username: str, password: str, role: str = "admin", db: AsyncConnection = Depends(get_db)):
     # Check if registration is enabled in settings
-    rs = db.execute("SELECT value FROM system_settings WHERE key = 'registration_enabled'")
+    rs = await db.execute("SELECT value FROM system_settings WHERE key = 'registration_enabled'")
     row = rs.fetchone()
     registration_enabled = row[0] == 'true' if row else False
 
     # Check if any admin exists
-    cursor = db.execute("SELECT COUNT(*) FROM admins")
+    cursor = await db.execute("SELECT COUNT(*) FROM admins")
     count = cursor.fetchone()[0]
     
     # Allow if no admin exists (bootstrap) OR if registration is explicitly enabled
@@ -76,25 +143,18 @@ async def seed_admin(username: str, password: str, role: str = "admin", db: libs
             detail="Registration is disabled. Please contact a system administrator."
         )
     
-    # Check if username exists
-    rs = db.execute("SELECT id FROM admins WHERE username = ?", [username])
-    if rs.fetchone():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, 
-            detail="Username already exists"
-        )
-    
-    # Create admin with hashed password
+    # Create admin with hashed password; an existing username inserts nothing
     admin_id = str(uuid.uuid4())
-    hashed_password = get_password_hash(password)
-    db.execute(
-        "INSERT INTO admins (id, username, hashed_password, role) VALUES (?, ?, ?, ?)",
-        [admin_id, username, hashed_password, role]
+    hashed_password = await get_password_hash_async(password)
+    uow = UnitOfWork(db)
+    uow.add(
+        "INSERT INTO admins (id, username, hashed_password, role) VALUES (?, ?, ?, ?) ON CONFLICT(username) DO NOTHING",
+        [admin_id, username, hashed_password, role],
+        on_empty=HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already exists")
     )
-    db.commit()
-    
     action = "register" if count > 0 else "seed"
-    log_audit(db, username, action, "admin", admin_id, {"role": role})
+    audit = queue_audit(uow, username, action, "admin", admin_id, {"role": role})
+    publish_audit((await uow.commit())[audit])
     
     return {"message": f"Admin '{username}' with role '{role}' created successfully"}
 
@@ -103,38 +163,31 @@ async def seed_admin(username: str, password: str, role: str = "admin", db: libs
 # ==========================================
 
 @router.get("/settings", response_model=List[SystemSettingResponse])
-def get_settings(db: libsql.Connection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
-    rs = db.execute("SELECT key, value, updated_at, updated_by FROM system_settings")
-    columns = [col[0] for col in rs.description]
-    return [dict(zip(columns, row)) for row in rs.fetchall()]
+async def get_settings(db: AsyncConnection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
+    rs = await db.execute("SELECT key, value, updated_at, updated_by FROM system_settings")
+    return rows_response(setting_encoder, rs)
 
 @router.get("/settings/{key}", response_model=SystemSettingResponse)
-def get_setting(key: str, db: libsql.Connection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
-    rs = db.execute("SELECT key, value, updated_at, updated_by FROM system_settings WHERE key = ?", [key])
+async def get_setting(key: str, db: AsyncConnection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
+    rs = await db.execute("SELECT key, value, updated_at, updated_by FROM system_settings WHERE key = ?", [key])
     row = rs.fetchone()
     if not row:
         raise HTTPException(status_code=404, detail="Setting not found")
-    columns = [col[0] for col in rs.description]
-    return dict(zip(columns, row))
+    return row_response(setting_encoder, rs, row)
 
 @router.patch("/settings/{key}")
-def update_setting(key: str, data: SystemSettingUpdate, db: libsql.Connection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
-    # Check if setting exists
-    rs = db.execute("SELECT key FROM system_settings WHERE key = ?", [key])
-    if not rs.fetchone():
-        # Create new setting
-        db.execute(
-            "INSERT INTO system_settings (key, value, updated_by) VALUES (?, ?, ?)",
-            [key, data.value, current_user["username"]]
-        )
-    else:
-        # Update existing
-        db.execute(
-            "UPDATE system_settings SET value = ?, updated_at = CURRENT_TIMESTAMP, updated_by = ? WHERE key = ?",
-            [data.value, current_user["username"], key]
-        )
-    db.commit()
-    log_audit(db, current_user["username"], "update", "setting", key, {"value": data.value})
+async def update_setting(key: str, data: SystemSettingUpdate, db: AsyncConnection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
+    # Create the setting or update the existing one
+    uow = UnitOfWork(db)
+    uow.add(
+        """
+        INSERT INTO system_settings (key, value, updated_by) VALUES (?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP, updated_by = excluded.updated_by
+        """,
+        [key, data.value, current_user["username"]]
+    )
+    audit = queue_audit(uow, current_user["username"], "update", "setting", key, {"value": data.value})
+    publish_audit((await uow.commit())[audit])
     return {"message": f"Setting '{key}' updated"}
 
 # ==========================================
@@ -142,52 +195,45 @@ def update_setting(key: str, data: SystemSettingUpdate, db: libsql.Connection =
 # ==========================================
 
 @router.get("/admins", response_model=List[AdminResponse])
-def list_admins(db: libsql.Connection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
-    rs = db.execute("SELECT id, username, role, email FROM admins ORDER BY username")
-    columns = [col[0] for col in rs.description]
-    return [dict(zip(columns, row)) for row in rs.fetchall()]
+async def list_admins(db: AsyncConnection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
+    rs = await db.execute("SELECT id, username, role, email FROM admins ORDER BY username")
+    return rows_response(admin_encoder, rs)
 
 @router.post("/admins", response_model=AdminResponse)
-def create_admin(admin: AdminCreate, db: libsql.Connection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
-    # Check if username exists
-    rs = db.execute("SELECT id FROM admins WHERE username = ?", [admin.username])
-    if rs.fetchone():
-        raise HTTPException(status_code=400, detail="Username already exists")
-    
+async def create_admin(admin: AdminCreate, db: AsyncConnection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
     admin_id = str(uuid.uuid4())
-    hashed_password = get_password_hash(admin.password)
-    db.execute(
-        "INSERT INTO admins (id, username, hashed_password, role, email) VALUES (?, ?, ?, ?, ?)",
-        [admin_id, admin.username, hashed_password, admin.role, admin.email]
+    hashed_password = await get_password_hash_async(admin.password)
+    uow = UnitOfWork(db)
+    uow.add(
+        "INSERT INTO admins (id, username, hashed_password, role, email) VALUES (?, ?, ?, ?, ?) ON CONFLICT(username) DO NOTHING",
+        [admin_id, admin.username, hashed_password, admin.role, admin.email],
+        on_empty=HTTPException(status_code=400, detail="Username already exists")
     )
-    db.commit()
-    log_audit(db, current_user["username"], "create", "admin", admin_id, {"username": admin.username, "role": admin.role})
+    audit = queue_audit(uow, current_user["username"], "create", "admin", admin_id, {"username": admin.username, "role": admin.role})
+    publish_audit((await uow.commit())[audit])
     return {"id": admin_id, "username": admin.username, "role": admin.role, "email": admin.email}
 
 @router.patch("/admins/{id}")
-def update_admin(id: str, admin: AdminUpdate, db: libsql.Connection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
-    # Check if admin exists
-    rs = db.execute("SELECT username FROM admins WHERE id = ?", [id])
-    existing = rs.fetchone()
-    if not existing:
-        raise HTTPException(status_code=404, detail="Admin not found")
-    
+async def update_admin(id: str, admin: AdminUpdate, db: AsyncConnection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
+    not_found = HTTPException(status_code=404, detail="Admin not found")
+    uow = UnitOfWork(db)
     updates = []
     params = []
     audit_details = {}
     
     if admin.username:
         # Check if new username conflicts
-        rs = db.execute("SELECT id FROM admins WHERE username = ? AND id != ?", [admin.username, id])
-        if rs.fetchone():
-            raise HTTPException(status_code=400, detail="Username already exists")
+        uow.add(
+            "SELECT 1 FROM admins WHERE username = ? AND id != ?", [admin.username, id],
+            on_rows=HTTPException(status_code=400, detail="Username already exists")
+        )
         updates.append("username = ?")
         params.append(admin.username)
         audit_details["username"] = admin.username
     
     if admin.password:
         updates.append("hashed_password = ?")
-        params.append(get_password_hash(admin.password))
+        params.append(await get_password_hash_async(admin.password))
         audit_details["password"] = "[changed]"
     
     if admin.role:
@@ -202,27 +248,32 @@ def update_admin(id: str, admin: AdminUpdate, db: libsql.Connection = Depends(ge
     
     if updates:
         params.append(id)
-        db.execute(f"UPDATE admins SET {', '.join(updates)} WHERE id = ?", params)
-        db.commit()
-        log_audit(db, current_user["username"], "update", "admin", id, audit_details)
+        uow.add(f"UPDATE admins SET {', '.join(updates)} WHERE id = ?", params, on_empty=not_found)
+        audit = queue_audit(uow, current_user["username"], "update", "admin", id, audit_details)
+        publish_audit((await uow.commit())[audit])
+    else:
+        rs = await db.execute("SELECT 1 FROM admins WHERE id = ?", [id])
+        if not rs.fetchone():
+            raise not_found
     
     return {"message": "Admin updated"}
 
 @router.delete("/admins/{id}")
-def delete_admin(id: str, db: libsql.Connection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
-    # Check if admin exists
-    rs = db.execute("SELECT username FROM admins WHERE id = ?", [id])
-    existing = rs.fetchone()
-    if not existing:
-        raise HTTPException(status_code=404, detail="Admin not found")
-    
+async def delete_admin(id: str, db: AsyncConnection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
+    uow = UnitOfWork(db)
     # Prevent deleting self
-    if existing[0] == current_user["username"]:
-        raise HTTPException(status_code=400, detail="Cannot delete yourself")
-    
-    db.execute("DELETE FROM admins WHERE id = ?", [id])
-    db.commit()
-    log_audit(db, current_user["username"], "delete", "admin", id, {"username": existing[0]})
+    uow.add(
+        "SELECT 1 FROM admins WHERE id = ? AND username = ?", [id, current_user["username"]],
+        on_rows=HTTPException(status_code=400, detail="Cannot delete yourself")
+    )
+    # Written before the delete so the details can still be read from the row; doubles as the existence check
+    audit = queue_audit_select(
+        uow, current_user["username"], "delete", "admin",
+        "SELECT id, json_object('username', username) FROM admins WHERE id = ?", [id],
+        on_empty=HTTPException(status_code=404, detail="Admin not found")
+    )
+    uow.add("DELETE FROM admins WHERE id = ?", [id])
+    publish_audit((await uow.commit())[audit])
     return {"message": "Admin deleted"}
 
 # ==========================================
@@ -230,126 +281,241 @@ def delete_admin(id: str, db: libsql.Connection = Depends(get_db), current_user:
 # ==========================================
 
 @router.get("/audit-logs", response_model=List[AuditLogResponse])
-def get_audit_logs(limit: int = 100, db: libsql.Connection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
-    rs = db.execute("SELECT * FROM audit_logs ORDER BY created_at DESC LIMIT ?", [limit])
-    columns = [col[0] for col in rs.description]
-    return [dict(zip(columns, row)) for row in rs.fetchall()]
+async def get_audit_logs(limit: int = 100, db: AsyncConnection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
+    rs = await db.execute("SELECT * FROM audit_logs ORDER BY created_at DESC LIMIT ?", [limit])
+    return rows_response(audit_encoder, rs)
+
+@router.get("/jobs", response_model=List[JobStatusResponse])
+async def get_jobs(db: AsyncConnection = Depends(get_db), current_user: dict = Depends(require_superadmin)):
+    # Cluster jobs report their last run on any worker; worker jobs report this worker's runs
+    rs = await db.execute(
+        """
+        SELECT name, schedule, 'cluster' AS scope, next_run_at,
+               lease_owner IS NOT NULL AND lease_until > CURRENT_TIMESTAMP AS running,
+               last_started_at, last_finished_at, last_status, last_message, last_duration_ms, run_count
+        FROM scheduler_jobs ORDER BY name
+        """
+    )
+    jobs = job_encoder.to_list(rs.description, rs.fetchall())
+    for job in jobs:
+        job["running"] = bool(job["running"])
+    jobs.extend(job.status() for job in scheduler.jobs() if not job.leader)
+    return json_response(jobs)
 
 # ==========================================
 # REGULAR ADMIN ENDPOINTS - Content Management
 # ==========================================
 
-@router.get("/pending", response_model=List[BioBuddyResponse])
-def get_pending_buddies(db: libsql.Connection = Depends(get_db), current_user: str = Depends(get_current_user)):
-    rs = db.execute("SELECT * FROM bio_buddies WHERE status = 'pending'")
-    columns = [col[0] for col in rs.description]
-    return [dict(zip(columns, row)) for row in rs.fetchall()]
+@router.get("/pending", response_model=List[BioBuddyAdminResponse])
+async def get_pending_buddies(db: AsyncConnection = Depends(get_db), current_user: str = Depends(get_current_user)):
+    rs = await db.execute("SELECT * FROM bio_buddies WHERE status = 'pending'")
+    return rows_response(buddy_encoder, rs)
 
 @router.patch("/approve-buddy/{id}")
-def approve_buddy(id: int, db: libsql.Connection = Depends(get_db), current_user: dict = Depends(get_current_user_with_role)):
-    # Get buddy name for logging
-    rs = db.execute("SELECT full_name, research_topic FROM bio_buddies WHERE id = ?", [id])
-    buddy = rs.fetchone()
-    if not buddy:
-        raise HTTPException(status_code=404, detail="Buddy not found")
-    
-    db.execute("UPDATE bio_buddies SET status = 'approved' WHERE id = ?", [id])
-    db.commit()
-    log_audit(db, current_user["username"], "approve", "bio_buddy", str(id), {"name": buddy[0], "topic": buddy[1]})
+async def approve_buddy(id: int, db: AsyncConnection = Depends(get_db), current_user: dict = Depends(get_current_user_with_role)):
+    uow = UnitOfWork(db)
+    approved = uow.add(
+        "UPDATE bio_buddies SET status = 'approved' WHERE id = ? RETURNING *", [id],
+        on_empty=HTTPException(status_code=404, detail="Buddy not found")
+    )
+    audit = queue_audit_select(
+        uow, current_user["username"], "approve", "bio_buddy",
+        "SELECT CAST(id AS TEXT), json_object('name', full_name, 'topic', research_topic) FROM bio_buddies WHERE id = ?", [id]
+    )
+    results = await uow.commit()
+    rs = results[approved]
+    broadcaster.publish("buddy.approved", buddy_encoder.to_dict(rs.description, rs.rows[0]))
+    publish_audit(results[audit])
     return {"message": "Buddy approved"}
 
+def queue_article_body(uow: UnitOfWork, content: Optional[str], article_id: Optional[int] = None) -> None:
+    """Store the compressed body of `article_id`, or of the article inserted just before, and index its text"""
+    id_sql, id_params = ("?", [article_id]) if article_id is not None else ("last_insert_rowid()", [])
+    if not content:
+        uow.add(f"DELETE FROM article_bodies WHERE article_id = {id_sql}", id_params)
+        uow.add(f"DELETE FROM article_search WHERE rowid = {id_sql}", id_params)
+        return
+    encoding, body = encode_body(content)
+    uow.add(
+        f"INSERT OR REPLACE INTO article_bodies (article_id, encoding, body, size) VALUES ({id_sql}, ?, ?, ?)",
+        id_params + [encoding, body, len(content.encode("utf-8"))]
+    )
+    uow.add(f"INSERT OR REPLACE INTO article_search (rowid, body) VALUES ({id_sql}, ?)", id_params + [plain_text(content)])
+
 @router.post("/articles", response_model=ArticleResponse)
-def create_article(article: ArticleCreate, db: libsql.Connection = Depends(get_db), current_user: dict = Depends(get_current_user_with_role)):
+async def create_article(article: ArticleCreate, db: AsyncConnection = Depends(get_db), current_user: dict = Depends(get_current_user_with_role)):
+    uow = UnitOfWork(db)
+    queue_attachment_check(uow, article.file_url)
     query = """
-    INSERT INTO articles (category, title, content, author, external_link, file_url, publication_date)
+    INSERT INTO articles (category, title, excerpt, author, external_link, file_url, publication_date)
     VALUES (?, ?, ?, ?, ?, ?, ?)
+    RETURNING *
     """
-    db.execute(query, [
-        article.category, article.title, article.content, 
+    created = uow.add(query, [
+        article.category, article.title, make_excerpt(article.content),
         article.author, article.external_link, article.file_url, article.publication_date
     ])
-    db.commit()
-    # Fetch latest to return
-    rs = db.execute("SELECT * FROM articles WHERE id = last_insert_rowid()")
-    columns = [col[0] for col in rs.description]
-    first_row = rs.fetchone()
-    if not first_row:
-        raise HTTPException(status_code=500, detail="Failed to create article")
-    result = dict(zip(columns, first_row))
-    log_audit(db, current_user["username"], "create", "article", str(result["id"]), {"title": article.title, "category": article.category})
-    return result
+    # The body row's rowid is the article id, so last_insert_rowid() still names the article below
+    if article.content:
+        queue_article_body(uow, article.content)
+    audit = queue_audit_select(
+        uow, current_user["username"], "create", "article",
+        "SELECT CAST(last_insert_rowid() AS TEXT), ?", [audit_details_json({"title": article.title, "category": article.category})]
+    )
+    results = await uow.commit()
+    await feed_cache.invalidate()
+    rs = results[created]
+    broadcaster.publish("article.created", article_summary_encoder.to_dict(rs.description, rs.rows[0]))
+    publish_audit(results[audit])
+    result = article_encoder.to_dict(rs.description, rs.rows[0])
+    result["content"] = article.content
+    return json_response(result)
 
-@router.patch("/articles/{id}")
-def update_article(id: int, data: ArticleUpdate, db: libsql.Connection = Depends(get_db), current_user: dict = Depends(get_current_user_with_role)):
-    # Check if article exists
-    rs = db.execute("SELECT title, category FROM articles WHERE id = ?", [id])
-    existing = rs.fetchone()
-    if not existing:
+@router.get("/articles/{id}", response_model=ArticleResponse)
+async def get_article_for_edit(id: int, db: AsyncConnection = Depends(get_db), current_user: dict = Depends(get_current_user_with_role)):
+    # The editor's copy: read fresh rather than through the public read cache, and not counted as a view
+    rs = await db.execute(ARTICLE_DETAIL_QUERY, [id])
+    row = rs.fetchone()
+    if not row:
         raise HTTPException(status_code=404, detail="Article not found")
-    
+    return json_response(with_body(article_encoder.to_dict(rs.description, row), row))
+
+@router.patch("/articles/{id}")
+async def update_article(id: int, data: ArticleUpdate, db: AsyncConnection = Depends(get_db), current_user: dict = Depends(get_current_user_with_role)):
+    not_found = HTTPException(status_code=404, detail="Article not found")
     updates = []
     params = []
     audit_details = {}
     
     update_data = data.model_dump(exclude_unset=True)
     if not update_data:
+        rs = await db.execute("SELECT 1 FROM articles WHERE id = ?", [id])
+        if not rs.fetchone():
+            raise not_found
         return {"message": "No changes provided"}
+    uow = UnitOfWork(db)
+    queue_attachment_check(uow, update_data.get("file_url"))
+
+    content_changed = "content" in update_data
+    content = update_data.pop("content", None)
+    if content_changed:
+        update_data["excerpt"] = make_excerpt(content)
+        # The body itself stays out of the audit log
+        audit_details["content_length"] = len(content or "")
 
     for field, value in update_data.items():
         updates.append(f"{field} = ?")
         params.append(value)
-        audit_details[field] = value
+        if field != "excerpt":
+            audit_details[field] = value
     
     if updates:
         params.append(id)
-        db.execute(f"UPDATE articles SET {', '.join(updates)} WHERE id = ?", params)
-        db.commit()
-        log_audit(db, current_user["username"], "update", "article", str(id), audit_details)
+        uow.add(f"UPDATE articles SET {', '.join(updates)}, updated_at = CURRENT_TIMESTAMP WHERE id = ?", params, on_empty=not_found)
+        if content_changed:
+            queue_article_body(uow, content, id)
+        audit = queue_audit(uow, current_user["username"], "update", "article", str(id), audit_details)
+        results = await uow.commit()
+        await feed_cache.invalidate()
+        broadcaster.publish("article.updated", {"id": id, **update_data})
+        publish_audit(results[audit])
     
     return {"message": "Article updated"}
 
 @router.delete("/articles/{id}")
-def delete_article(id: int, db: libsql.Connection = Depends(get_db), current_user: dict = Depends(get_current_user_with_role)):
-    # Get article info for logging
-    rs = db.execute("SELECT title, category FROM articles WHERE id = ?", [id])
-    article = rs.fetchone()
-    if article:
-        log_audit(db, current_user["username"], "delete", "article", str(id), {"title": article[0], "category": article[1]})
-    db.execute("DELETE FROM articles WHERE id = ?", [id])
-    db.commit()
+async def delete_article(id: int, db: AsyncConnection = Depends(get_db), current_user: dict = Depends(get_current_user_with_role)):
+    uow = UnitOfWork(db)
+    # Logged before the delete so the details can still be read from the row
+    audit = queue_audit_select(
+        uow, current_user["username"], "delete", "article",
+        "SELECT CAST(id AS TEXT), json_object('title', title, 'category', category) FROM articles WHERE id = ?", [id]
+    )
+    deleted = uow.add("DELETE FROM articles WHERE id = ?", [id])
+    uow.add("DELETE FROM article_bodies WHERE article_id = ?", [id])
+    uow.add("DELETE FROM article_search WHERE rowid = ?", [id])
+    uow.add("DELETE FROM article_stats WHERE article_id = ?", [id])
+    results = await uow.commit()
+    if results[deleted].rowcount > 0:
+        await feed_cache.invalidate()
+        view_counter.forget(id)
+        broadcaster.publish("article.deleted", {"id": id})
+    publish_audit(results[audit])
     return {"message": "Article deleted"}
 
 @router.delete("/buddies/{id}")
-def delete_buddy(id: int, db: libsql.Connection = Depends(get_db), current_user: dict = Depends(get_current_user_with_role)):
-    # Get buddy info for logging
-    rs = db.execute("SELECT full_name FROM bio_buddies WHERE id = ?", [id])
-    buddy = rs.fetchone()
-    if buddy:
-        log_audit(db, current_user["username"], "delete", "bio_buddy", str(id), {"name": buddy[0]})
-    db.execute("DELETE FROM bio_buddies WHERE id = ?", [id])
-    db.commit()
+async def delete_buddy(id: int, db: AsyncConnection = Depends(get_db), current_user: dict = Depends(get_current_user_with_role)):
+    uow = UnitOfWork(db)
+    audit = queue_audit_select(
+        uow, current_user["username"], "delete", "bio_buddy",
+        "SELECT CAST(id AS TEXT), json_object('name', full_name) FROM bio_buddies WHERE id = ?", [id]
+    )
+    deleted = uow.add("DELETE FROM bio_buddies WHERE id = ?", [id])
+    results = await uow.commit()
+    if results[deleted].rowcount > 0:
+        broadcaster.publish("buddy.deleted", {"id": id})
+    publish_audit(results[audit])
     return {"message": "Buddy deleted"}
 
+# Attachments: the file is sent as the raw request body and streamed to disk
+@router.post("/attachments", response_model=AttachmentInfo)
+async def upload_attachment(request: Request, filename: str, db: AsyncConnection = Depends(get_db), current_user: dict = Depends(get_current_user_with_role)):
+    content_type = request.headers.get("content-type", "application/octet-stream").split(";")[0].strip().lower()
+    if content_type.startswith("multipart/"):
+        raise HTTPException(status_code=400, detail="Send the file as the raw request body, not as a multipart form")
+
+    stored = await save_stream(request.stream(), settings.ATTACHMENT_MAX_BYTES)
+    content_type = await detect_media_type(stored.sha256, content_type)
+    uow = UnitOfWork(db)
+    uow.add(
+        "INSERT OR IGNORE INTO attachments (sha256, filename, content_type, size, uploaded_by) VALUES (?, ?, ?, ?, ?)",
+        [stored.sha256, filename, content_type, stored.size, current_user["username"]]
+    )
+    # The first upload of a file names it; re-uploads keep the stored metadata
+    stored_meta = uow.add("SELECT filename, content_type FROM attachments WHERE sha256 = ?", [stored.sha256])
+    audit = queue_audit_select(
+        uow, current_user["username"], "upload", "attachment",
+        "SELECT sha256, json_object('filename', filename, 'size', size, 'deduplicated', json(?)) FROM attachments WHERE sha256 = ?",
+        [json.dumps(not stored.created), stored.sha256]
+    )
+    results = await uow.commit()
+    filename, content_type = results[stored_meta].rows[0]
+    publish_audit(results[audit])
+    schedule_preview(stored.sha256, content_type)
+
+    return {
+        "sha256": stored.sha256,
+        "filename": filename,
+        "content_type": content_type,
+        "size": stored.size,
+        "url": str(request.url_for("download_attachment", sha256=stored.sha256)),
+        "preview_url": str(request.url_for("download_attachment_preview", sha256=stored.sha256)),
+    }
+
 # Feedback Management
 @router.get("/feedbacks")
-def get_feedbacks(db: libsql.Connection = Depends(get_db), current_user: str = Depends(get_current_user)):
-    rs = db.execute("SELECT * FROM feedbacks ORDER BY created_at DESC")
-    columns = [col[0] for col in rs.description]
-    return [dict(zip(columns, row)) for row in rs.fetchall()]
+async def get_feedbacks(db: AsyncConnection = Depends(get_db), current_user: str = Depends(get_current_user)):
+    rs = await db.execute(
+        "SELECT id, sender_name, email, student_id, subject, message, is_read, created_at FROM feedbacks ORDER BY created_at DESC"
+    )
+    return rows_response(raw_encoder, rs)
 
 @router.patch("/feedbacks/{id}/read")
-def mark_feedback_read(id: int, db: libsql.Connection = Depends(get_db), current_user: str = Depends(get_current_user)):
-    db.execute("UPDATE feedbacks SET is_read = 1 WHERE id = ?", [id])
-    db.commit()
+async def mark_feedback_read(id: int, db: AsyncConnection = Depends(get_db), current_user: str = Depends(get_current_user)):
+    uow = UnitOfWork(db)
+    uow.add("UPDATE feedbacks SET is_read = 1 WHERE id = ?", [id])
+    await uow.commit()
+    broadcaster.publish("feedback.read", {"id": id})
     return {"message": "Feedback marked as read"}
 @router.delete("/feedbacks/{id}")
-def delete_feedback(id: int, db: libsql.Connection = Depends(get_db), current_user: dict = Depends(get_current_user_with_role)):
-    # Get feedback info for logging
-    rs = db.execute("SELECT sender_name, subject FROM feedbacks WHERE id = ?", [id])
-    feedback = rs.fetchone()
-    if feedback:
-        log_audit(db, current_user["username"], "delete", "feedback", str(id), {"sender": feedback[0], "subject": feedback[1]})
-    
-    db.execute("DELETE FROM feedbacks WHERE id = ?", [id])
-    db.commit()
+async def delete_feedback(id: int, db: AsyncConnection = Depends(get_db), current_user: dict = Depends(get_current_user_with_role)):
+    uow = UnitOfWork(db)
+    audit = queue_audit_select(
+        uow, current_user["username"], "delete", "feedback",
+        "SELECT CAST(id AS TEXT), json_object('sender', sender_name, 'subject', subject) FROM feedbacks WHERE id = ?", [id]
+    )
+    deleted = uow.add("DELETE FROM feedbacks WHERE id = ?", [id])
+    results = await uow.commit()
+    if results[deleted].rowcount > 0:
+        broadcaster.publish("feedback.deleted", {"id": id})
+    publish_audit(results[audit])
     return {"message": "Feedback deleted"}
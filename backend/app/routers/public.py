@@ -1,138 +1,306 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-import libsql
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from typing import Awaitable, Callable, Hashable, List, Optional
+import asyncio
+import orjson
 import threading
-from ..database import get_db
-from ..models import BioBuddyResponse, BioBuddyCreate, ArticleResponse, FeedbackCreate, LabResponse
-from ..email_service import is_smtp_configured, send_email_async, create_feedback_notification_email
+from ..article_content import ARTICLE_DETAIL_QUERY, ARTICLE_SUMMARY_COLUMNS, article_search_condition, with_body
+from ..config import settings
+from ..database import AsyncConnection, UnitOfWork, db_connection, get_db
+from ..dedupe import duplicate_submission, duplicate_window, fingerprint, idempotent
+from ..rate_limit import rate_limit
+from ..serialization import EncodedJSON, RowEncoder, encode_json, encoded_response, json_response
+from ..singleflight import SingleFlight
+from ..storage import SHA256_PATTERN, AttachmentResponse, object_path, preview_path
+from ..events import broadcaster
+from ..feeds import ALL_CATEGORIES, FEED_FORMATS, document_response, feed_cache
+from ..view_counter import view_counter
+from ..models import (
+    BioBuddyResponse, BioBuddyAdminResponse, BioBuddyCreate, ArticleResponse, ArticleSummaryResponse, FeedbackCreate,
+    LabResponse, PopularArticleResponse
+)
+from ..email_service import (
+    EMAIL_SEND_TIMEOUT_SECONDS, is_smtp_configured, send_email_async, create_feedback_notification_email
+)
+from ..scheduler import scheduler
 
 router = APIRouter()
 
+buddy_encoder = RowEncoder(BioBuddyResponse)
+pending_buddy_encoder = RowEncoder(BioBuddyAdminResponse)
+article_encoder = RowEncoder(ArticleResponse)
+article_summary_encoder = RowEncoder(ArticleSummaryResponse)
+lab_encoder = RowEncoder(LabResponse)
+# Search results have no response_model, so rows are passed through as-is
+raw_encoder = RowEncoder()
+
+# Columns exposed by endpoints that pass rows through as-is (internal fingerprints stay private)
+BUDDY_PUBLIC_COLUMNS = (
+    "id, full_name, student_id, course, email, phone, research_topic, research_field, "
+    "research_subject, description, status, created_at"
+)
+FEEDBACK_COLUMNS = "id, sender_name, email, student_id, subject, message, is_read, created_at"
+
+# Identical concurrent reads share one query and one encoded body
+read_flights = SingleFlight()
+
+# Attachment metadata never changes for a given hash
+ATTACHMENT_META_CACHE_SIZE = 4096
+attachment_meta_cache = {}
+
+
+async def coalesced_read(key: Hashable, load: Callable[[], Awaitable[EncodedJSON]]):
+    try:
+        encoded = await read_flights.do(key, load, settings.SINGLEFLIGHT_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Server is busy, please try again", headers={"Retry-After": "1"})
+    return encoded_response(encoded)
+
 
 @router.get("/buddies", response_model=List[BioBuddyResponse])
-def get_approved_buddies(course: str = None, db: libsql.Connection = Depends(get_db)):
+async def get_approved_buddies(course: str = None):
     query = "SELECT * FROM bio_buddies WHERE status = 'approved'"
     params = []
     if course and course != "All":
         query += " AND course = ?"
         params.append(course)
-    rs = db.execute(query, params)
-    columns = [col[0] for col in rs.description]
-    return [dict(zip(columns, row)) for row in rs.fetchall()]
-
-@router.post("/buddies/submit")
-def submit_buddy(buddy: BioBuddyCreate, db: libsql.Connection = Depends(get_db)):
-    query = """
-    INSERT INTO bio_buddies (full_name, student_id, course, email, phone, research_topic, research_field, research_subject, description)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """
-    db.execute(query, [
-        buddy.full_name, buddy.student_id, buddy.course, buddy.email, 
-        buddy.phone, buddy.research_topic, buddy.research_field, 
-        buddy.research_subject, buddy.description
-    ])
-    db.commit()
-    return {"message": "Submitted for approval"}
 
-@router.get("/articles", response_model=List[ArticleResponse])
-def get_articles(category: str = None, db: libsql.Connection = Depends(get_db)):
-    query = "SELECT * FROM articles"
+    async def load():
+        async with db_connection() as db:
+            rs = await db.execute(query, params)
+        return encode_json(buddy_encoder.encode_rows(rs.description, rs.fetchall()))
+
+    return await coalesced_read(("buddies", tuple(params)), load)
+
+@router.post("/buddies/submit", dependencies=[Depends(rate_limit("buddy_submit", settings.RATE_LIMIT_BUDDY_SUBMIT))])
+async def submit_buddy(buddy: BioBuddyCreate, idempotency_key: Optional[str] = Header(None), db: AsyncConnection = Depends(get_db)):
+    buddy_fingerprint = fingerprint(
+        buddy.email, buddy.full_name, buddy.student_id, buddy.course, buddy.phone, buddy.research_topic,
+        buddy.research_field, buddy.research_subject, buddy.description
+    )
+    topic_key = fingerprint(buddy.email, buddy.research_topic)
+
+    async def submit():
+        uow = UnitOfWork(db)
+        # Checked inside the insert's write transaction, so concurrent copies cannot both pass
+        uow.add(
+            "SELECT 1 FROM bio_buddies WHERE fingerprint = ? AND created_at >= datetime('now', ?)",
+            [buddy_fingerprint, duplicate_window()],
+            on_rows=duplicate_submission()
+        )
+        query = """
+        INSERT INTO bio_buddies (full_name, student_id, course, email, phone, research_topic, research_field, research_subject, description,
+                                 fingerprint, topic_key, near_duplicate_of)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, (SELECT MAX(id) FROM bio_buddies WHERE topic_key = ?))
+        RETURNING *
+        """
+        created = uow.add(query, [
+            buddy.full_name, buddy.student_id, buddy.course, buddy.email, 
+            buddy.phone, buddy.research_topic, buddy.research_field, 
+            buddy.research_subject, buddy.description,
+            buddy_fingerprint, topic_key, topic_key
+        ])
+        rs = (await uow.commit())[created]
+        broadcaster.publish("buddy.pending", pending_buddy_encoder.to_dict(rs.description, rs.rows[0]))
+        return {"message": "Submitted for approval"}
+
+    return await idempotent("buddy_submit", idempotency_key, buddy_fingerprint, submit)
+
+@router.get("/articles", response_model=List[ArticleSummaryResponse])
+async def get_articles(category: str = None, q: Optional[str] = None):
+    query = f"SELECT {ARTICLE_SUMMARY_COLUMNS} FROM articles"
+    conditions = []
     params = []
     if category:
-        query += " WHERE category = ?"
+        conditions.append("category = ?")
         params.append(category)
-    rs = db.execute(query, params)
-    columns = [col[0] for col in rs.description]
-    return [dict(zip(columns, row)) for row in rs.fetchall()]
+    if q and q.strip():
+        condition, search_params = article_search_condition(q.strip())
+        conditions.append(condition)
+        params.extend(search_params)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    async def load():
+        async with db_connection() as db:
+            rs = await db.execute(query, params)
+        return encode_json(article_summary_encoder.encode_rows(rs.description, rs.fetchall()))
+
+    return await coalesced_read(("articles", tuple(params)), load)
+
+# Declared before /articles/{article_id} so "popular" is not parsed as an id
+@router.get("/articles/popular", response_model=List[PopularArticleResponse])
+async def get_popular_articles(
+    category: Optional[str] = None, limit: int = Query(10, ge=1, le=settings.POPULAR_ARTICLES_PER_CATEGORY)
+):
+    # Served from the ranking the view counter reloads on every flush (top N per category); never touches the DB
+    return json_response(view_counter.popular(category, limit))
 
 @router.get("/articles/{article_id}", response_model=ArticleResponse)
-def get_article(article_id: int, db: libsql.Connection = Depends(get_db)):
-    rs = db.execute("SELECT * FROM articles WHERE id = ?", [article_id])
-    row = rs.fetchone()
-    if not row:
-        raise HTTPException(status_code=404, detail="Article not found")
-    columns = [col[0] for col in rs.description]
-    return dict(zip(columns, row))
+async def get_article(article_id: int):
+    async def load():
+        async with db_connection() as db:
+            rs = await db.execute(ARTICLE_DETAIL_QUERY, [article_id])
+        row = rs.fetchone()
+        if not row:
+            raise HTTPException(status_code=404, detail="Article not found")
+        return encode_json(orjson.dumps(with_body(article_encoder.to_dict(rs.description, row), row)))
+
+    response = await coalesced_read(("article", article_id), load)
+    view_counter.record(article_id)
+    return response
+
+@router.get("/feeds/{kind}")
+async def get_feed(kind: str, request: Request, category: str = ALL_CATEGORIES):
+    # RSS or Atom; built from memory and only rebuilt after article changes
+    if kind not in FEED_FORMATS:
+        raise HTTPException(status_code=404, detail="Unknown feed format")
+    document = await feed_cache.get(kind, category)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Unknown category")
+    return document_response(request, document)
+
+@router.get("/sitemap.xml")
+async def get_sitemap(request: Request):
+    return document_response(request, await feed_cache.get("sitemap", ALL_CATEGORIES))
 
 @router.get("/search")
-def global_search(q: str, db: libsql.Connection = Depends(get_db)):
+async def global_search(q: str):
     keyword = f"%{q}%"
-    
-    # Search in approved buddies
-    buddies_rs = db.execute(
-        "SELECT * FROM bio_buddies WHERE status = 'approved' AND (full_name LIKE ? OR research_topic LIKE ? OR description LIKE ?)",
-        [keyword, keyword, keyword]
-    )
-    
-    # Search in articles
-    articles_rs = db.execute(
-        "SELECT * FROM articles WHERE title LIKE ? OR content LIKE ? OR author LIKE ?",
-        [keyword, keyword, keyword]
-    )
-    
-    columns_b = [col[0] for col in buddies_rs.description]
-    columns_a = [col[0] for col in articles_rs.description]
-    
-    return {
-        "buddies": [dict(zip(columns_b, row)) for row in buddies_rs.fetchall()],
-        "articles": [dict(zip(columns_a, row)) for row in articles_rs.fetchall()]
-    }
+
+    async def load():
+        async with db_connection() as db:
+            # Search in approved buddies
+            buddies_rs = await db.execute(
+                f"SELECT {BUDDY_PUBLIC_COLUMNS} FROM bio_buddies WHERE status = 'approved' AND (full_name LIKE ? OR research_topic LIKE ? OR description LIKE ?)",
+                [keyword, keyword, keyword]
+            )
+
+            # Search in articles; bodies are matched through their full-text index
+            condition, search_params = article_search_condition(q)
+            articles_rs = await db.execute(f"SELECT {ARTICLE_SUMMARY_COLUMNS} FROM articles WHERE {condition}", search_params)
+
+        return encode_json(orjson.dumps({
+            "buddies": raw_encoder.to_list(buddies_rs.description, buddies_rs.fetchall()),
+            "articles": raw_encoder.to_list(articles_rs.description, articles_rs.fetchall())
+        }))
+
+    return await coalesced_read(("search", q), load)
 
 @router.get("/labs", response_model=List[LabResponse])
-def get_labs(db: libsql.Connection = Depends(get_db)):
-    rs = db.execute("SELECT * FROM labs")
-    columns = [col[0] for col in rs.description]
-    return [dict(zip(columns, row)) for row in rs.fetchall()]
+async def get_labs():
+    async def load():
+        async with db_connection() as db:
+            rs = await db.execute("SELECT * FROM labs")
+        return encode_json(lab_encoder.encode_rows(rs.description, rs.fetchall()))
+
+    return await coalesced_read(("labs",), load)
+
+async def get_attachment_meta(sha256: str):
+    """Filename and content type of a stored attachment; immutable, so cached once loaded"""
+    meta = attachment_meta_cache.get(sha256)
+    if meta is None:
+        if not SHA256_PATTERN.match(sha256):
+            raise HTTPException(status_code=404, detail="Attachment not found")
+
+        async def load():
+            async with db_connection() as db:
+                rs = await db.execute("SELECT filename, content_type FROM attachments WHERE sha256 = ?", [sha256])
+            row = rs.fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="Attachment not found")
+            return row
+
+        try:
+            meta = await read_flights.do(("attachment", sha256), load, settings.SINGLEFLIGHT_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="Server is busy, please try again", headers={"Retry-After": "1"})
+        if len(attachment_meta_cache) >= ATTACHMENT_META_CACHE_SIZE:
+            attachment_meta_cache.clear()
+        attachment_meta_cache[sha256] = meta
+    return meta
+
+@router.api_route("/attachments/{sha256}", methods=["GET", "HEAD"], name="download_attachment")
+async def download_attachment(sha256: str):
+    filename, content_type = await get_attachment_meta(sha256)
+    path = object_path(sha256)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    return AttachmentResponse(path, f'"{sha256}"', content_type, filename)
+
+@router.api_route("/attachments/{sha256}/preview", methods=["GET", "HEAD"], name="download_attachment_preview")
+async def download_attachment_preview(sha256: str):
+    await get_attachment_meta(sha256)
+    path = preview_path(sha256)
+    if not path.exists():
+        # Previews are generated in the background and may not be ready yet
+        raise HTTPException(status_code=404, detail="Preview not available")
+    return AttachmentResponse(path, f'"{sha256}.preview"', "image/jpeg")
 
 @router.get("/registration-status")
-def get_registration_status(db: libsql.Connection = Depends(get_db)):
+async def get_registration_status(db: AsyncConnection = Depends(get_db)):
     """Check if admin registration is enabled (public endpoint)"""
-    rs = db.execute("SELECT value FROM system_settings WHERE key = 'registration_enabled'")
+    rs = await db.execute("SELECT value FROM system_settings WHERE key = 'registration_enabled'")
     row = rs.fetchone()
     enabled = row[0] == 'true' if row else False
     return {"enabled": enabled}
 
-@router.post("/feedback")
-async def submit_feedback(feedback: FeedbackCreate, db: libsql.Connection = Depends(get_db)):
-    # Save feedback to database
-    query = """
-    INSERT INTO feedbacks (sender_name, email, student_id, subject, message)
-    VALUES (?, ?, ?, ?, ?)
+@router.post("/feedback", dependencies=[Depends(rate_limit("feedback", settings.RATE_LIMIT_FEEDBACK))])
+async def submit_feedback(feedback: FeedbackCreate, idempotency_key: Optional[str] = Header(None), db: AsyncConnection = Depends(get_db)):
+    feedback_fingerprint = fingerprint(
+        feedback.email, feedback.sender_name, feedback.student_id, feedback.subject, feedback.message
+    )
+    return await idempotent(
+        "feedback", idempotency_key, feedback_fingerprint,
+        lambda: save_feedback(feedback, feedback_fingerprint, db)
+    )
+
+async def save_feedback(feedback: FeedbackCreate, feedback_fingerprint: str, db: AsyncConnection):
+    # Save feedback to database; duplicates are rejected here, before any email goes out
+    uow = UnitOfWork(db)
+    uow.add(
+        "SELECT 1 FROM feedbacks WHERE fingerprint = ? AND created_at >= datetime('now', ?)",
+        [feedback_fingerprint, duplicate_window()],
+        on_rows=duplicate_submission()
+    )
+    query = f"""
+    INSERT INTO feedbacks (sender_name, email, student_id, subject, message, fingerprint)
+    VALUES (?, ?, ?, ?, ?, ?)
+    RETURNING {FEEDBACK_COLUMNS}
     """
-    db.execute(query, [
+    created = uow.add(query, [
         feedback.sender_name, feedback.email, feedback.student_id,
-        feedback.subject, feedback.message
+        feedback.subject, feedback.message, feedback_fingerprint
     ])
-    db.commit()
+    rs = (await uow.commit())[created]
+    broadcaster.publish("feedback.created", raw_encoder.to_dict(rs.description, rs.rows[0]))
     
-    # Send email notification to admins (if SMTP is configured)
+    # Notify admins by email in the background, so SMTP never delays the response
     if is_smtp_configured():
-        try:
-            # Get all admin emails (where email is not null)
-            admin_rs = db.execute("SELECT email FROM admins WHERE email IS NOT NULL AND email != ''")
-            admin_emails = [row[0] for row in admin_rs.fetchall()]
-            
-            if admin_emails:
-                # Create email content
-                email_subject, html_content, text_content = create_feedback_notification_email(
-                    sender_name=feedback.sender_name,
-                    sender_email=feedback.email,
-                    student_id=feedback.student_id,
-                    subject=feedback.subject,
-                    message=feedback.message
-                )
-                
-                # Send email asynchronously
-                await send_email_async(
-                    to_emails=admin_emails,
-                    subject=email_subject,
-                    html_content=html_content,
-                    text_content=text_content
-                )
-        except Exception as e:
-            # Log error but don't fail the feedback submission
-            import logging
-            logging.getLogger(__name__).error(f"Failed to send notification email: {e}")
+        scheduler.submit(
+            "feedback-notification", lambda: notify_admins_of_feedback(feedback), timeout=EMAIL_SEND_TIMEOUT_SECONDS
+        )
     
     return {"message": "Feedback submitted successfully"}
 
+async def notify_admins_of_feedback(feedback: FeedbackCreate):
+    # Runs after the response, so it opens its own connection
+    async with db_connection() as db:
+        # Get all admin emails (where email is not null)
+        admin_rs = await db.execute("SELECT email FROM admins WHERE email IS NOT NULL AND email != ''")
+    admin_emails = [row[0] for row in admin_rs.fetchall()]
+    if not admin_emails:
+        return
+
+    email_subject, html_content, text_content = create_feedback_notification_email(
+        sender_name=feedback.sender_name,
+        sender_email=feedback.email,
+        student_id=feedback.student_id,
+        subject=feedback.subject,
+        message=feedback.message
+    )
+    await send_email_async(
+        to_emails=admin_emails,
+        subject=email_subject,
+        html_content=html_content,
+        text_content=text_content
+    )
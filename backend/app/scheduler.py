@@ -0,0 +1,408 @@
+"""
+Scheduler Module for BiosciZone
+In-process interval and cron jobs, run once per cluster through a DB lease
+"""
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from zoneinfo import ZoneInfo
+
+from .config import settings
+from .database import UnitOfWork, db_connection
+
+logger = logging.getLogger(__name__)
+
+# Longest the loop sleeps, so it notices runs claimed or rescheduled by other workers
+POLL_SECONDS = 60.0
+# A lease outlives the job timeout by this much before another worker may take over
+LEASE_MARGIN_SECONDS = 30.0
+
+DB_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def to_db_time(value: datetime) -> str:
+    # Same UTC text form as CURRENT_TIMESTAMP, so values compare as strings
+    return value.astimezone(timezone.utc).strftime(DB_TIME_FORMAT)
+
+
+def from_db_time(value: str) -> datetime:
+    return datetime.strptime(value, DB_TIME_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def to_api_time(value: Optional[datetime]) -> Optional[str]:
+    # The form RowEncoder gives DB timestamps (naive UTC), so worker and cluster jobs read alike
+    return value.astimezone(timezone.utc).replace(tzinfo=None).isoformat(timespec="seconds") if value else None
+
+
+class Interval:
+    """Run every `seconds`; the first run is one interval after start-up unless `immediate`"""
+
+    def __init__(self, seconds: float, immediate: bool = False):
+        self.seconds = seconds
+        self.immediate = immediate
+
+    def first(self, now: datetime) -> datetime:
+        return now if self.immediate else self.next(now)
+
+    def next(self, after: datetime) -> datetime:
+        return after + timedelta(seconds=self.seconds)
+
+    def __str__(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> Set[int]:
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Cron field out of range: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class Cron:
+    """
+    Standard five-field cron expression (minute hour day-of-month month day-of-week)
+
+    Supports `*`, lists, ranges and steps, evaluated in SCHEDULER_TIMEZONE. As in
+    cron, when both day fields are restricted a day matching either one runs.
+    """
+
+    def __init__(self, expression: str, tz: Optional[str] = None):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.tz = ZoneInfo(tz or settings.SCHEDULER_TIMEZONE)
+        self.minutes = _parse_cron_field(fields[0], 0, 59)
+        self.hours = _parse_cron_field(fields[1], 0, 23)
+        self.days = _parse_cron_field(fields[2], 1, 31)
+        self.months = _parse_cron_field(fields[3], 1, 12)
+        # 0 and 7 are both Sunday
+        self.weekdays = {day % 7 for day in _parse_cron_field(fields[4], 0, 7)}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def first(self, now: datetime) -> datetime:
+        return self.next(now)
+
+    def next(self, after: datetime) -> datetime:
+        # Walk local wall-clock time, skipping whole months, days and hours that cannot match
+        moment = after.astimezone(self.tz).replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=5 * 366)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.replace(tzinfo=self.tz).astimezone(timezone.utc)
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+    def __str__(self) -> str:
+        return f"cron {self.expression} ({self.tz.key})"
+
+
+class Job:
+    """
+    A periodic coroutine
+
+    Cluster jobs (`leader=True`) run on whichever worker first claims the lease
+    row once the run is due; worker jobs run in every process, for work on
+    per-process state. With `misfire_grace` (seconds), a run found more than
+    that late, e.g. after the app was down, is skipped for the next occurrence.
+    """
+
+    def __init__(self, name: str, schedule, fn: Callable[[], Awaitable[Any]], timeout: float,
+                 jitter: float = 0.0, leader: bool = True, misfire_grace: Optional[float] = None):
+        self.name = name
+        self.schedule = schedule
+        self.fn = fn
+        self.timeout = timeout
+        self.jitter = jitter
+        self.leader = leader
+        self.misfire_grace = misfire_grace
+        self.due: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None
+        # Outcome of this worker's latest run
+        self.last_started_at: Optional[datetime] = None
+        self.last_finished_at: Optional[datetime] = None
+        self.last_status: Optional[str] = None
+        self.last_message: Optional[str] = None
+        self.last_duration_ms: Optional[int] = None
+        self.run_count = 0
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "schedule": str(self.schedule),
+            "scope": "cluster" if self.leader else "worker",
+            "next_run_at": to_api_time(self.due),
+            "running": self.task is not None,
+            "last_started_at": to_api_time(self.last_started_at),
+            "last_finished_at": to_api_time(self.last_finished_at),
+            "last_status": self.last_status,
+            "last_message": self.last_message,
+            "last_duration_ms": self.last_duration_ms,
+            "run_count": self.run_count,
+        }
+
+    def misfired(self, now: datetime) -> bool:
+        """Whether the due run is too late to still be worth running"""
+        return (self.misfire_grace is not None and self.due is not None
+                and (now - self.due).total_seconds() > self.misfire_grace)
+
+
+class Scheduler:
+    """
+    Runs jobs on the event loop of each worker
+
+    Leader election is per run: every worker computes when a cluster job is due,
+    waits a random jitter, then tries to claim the job's row in scheduler_jobs.
+    The claim only succeeds while the run is due and no unexpired lease exists,
+    and it moves next_run_at forward, so exactly one worker runs each occurrence.
+    The lease expires after the job's timeout, so a worker that dies mid-run does
+    not block the job for good. Also tracks fire-and-forget tasks (`submit`) so
+    shutdown can wait for them.
+    """
+
+    def __init__(self):
+        # Set in start(): with preload_app the module is imported before workers fork
+        self.owner: Optional[str] = None
+        self._jobs: Dict[str, Job] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._registered = False
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def add(self, job: Job) -> None:
+        self._jobs[job.name] = job
+
+    def jobs(self) -> List[Job]:
+        return list(self._jobs.values())
+
+    def submit(self, name: str, fn: Callable[[], Awaitable[Any]], timeout: float) -> None:
+        """Run a coroutine in the background, outside the request that triggered it"""
+        async def run():
+            try:
+                await asyncio.wait_for(fn(), timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"Background task {name} timed out after {timeout:g}s")
+            except Exception as e:
+                logger.error(f"Background task {name} failed: {e}")
+
+        task = asyncio.create_task(run(), name=name)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def start(self) -> None:
+        if self._loop_task is None:
+            self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+            self._loop_task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Stop scheduling, then give running jobs and background tasks the grace period to finish"""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+        pending = self._background | {job.task for job in self._jobs.values() if job.task is not None}
+        if not pending:
+            return
+        _, still_running = await asyncio.wait(pending, timeout=settings.SCHEDULER_SHUTDOWN_GRACE_SECONDS)
+        for task in still_running:
+            task.cancel()
+        if still_running:
+            logger.warning(f"Cancelled {len(still_running)} scheduled task(s) at shutdown")
+
+    async def _register(self, now: datetime) -> None:
+        """Create or reschedule the lease rows of cluster jobs and load when each is due"""
+        async with db_connection() as db:
+            uow = UnitOfWork(db)
+            for job in self._jobs.values():
+                if not job.leader:
+                    continue
+                # A changed schedule replaces the stored next run
+                uow.add(
+                    """
+                    INSERT INTO scheduler_jobs (name, schedule, next_run_at) VALUES (?, ?, ?)
+                    ON CONFLICT(name) DO UPDATE SET schedule = excluded.schedule, next_run_at = excluded.next_run_at
+                    WHERE scheduler_jobs.schedule IS NOT excluded.schedule
+                    """,
+                    [job.name, str(job.schedule), to_db_time(job.schedule.first(now))]
+                )
+            loaded = uow.add("SELECT name, next_run_at FROM scheduler_jobs")
+            results = await uow.commit()
+        for name, next_run_at in results[loaded].rows:
+            job = self._jobs.get(name)
+            if job is not None and job.leader:
+                job.due = from_db_time(next_run_at)
+        self._registered = True
+
+    async def _loop(self) -> None:
+        now = utcnow()
+        for job in self._jobs.values():
+            if not job.leader:
+                job.due = job.schedule.first(now)
+        while True:
+            now = utcnow()
+            if not self._registered:
+                try:
+                    await self._register(now)
+                except Exception as e:
+                    logger.error(f"Scheduler registration failed: {e}")
+            for job in self._jobs.values():
+                if job.task is None and job.misfired(now):
+                    await self._skip(job, now)
+                if job.due is not None and job.due <= now and job.task is None:
+                    # Provisional; a lost claim replaces it with the winner's schedule
+                    job.due = job.schedule.next(now)
+                    job.task = asyncio.create_task(self._run(job), name=f"job:{job.name}")
+                    job.task.add_done_callback(lambda _, job=job: setattr(job, "task", None))
+            wake = min((job.due for job in self._jobs.values() if job.due is not None), default=None)
+            delay = POLL_SECONDS if wake is None else (wake - utcnow()).total_seconds()
+            await asyncio.sleep(min(max(delay, 0.0), POLL_SECONDS))
+
+    async def _run(self, job: Job) -> None:
+        if job.jitter:
+            await asyncio.sleep(random.uniform(0, job.jitter))
+        started = utcnow()
+        if job.leader:
+            try:
+                if not await self._claim(job, started):
+                    return
+            except Exception as e:
+                logger.error(f"Could not claim job {job.name}: {e}")
+                return
+
+        status, message = "ok", None
+        timer = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(job.fn(), job.timeout)
+            if isinstance(result, str):
+                message = result
+        except asyncio.TimeoutError:
+            status, message = "timeout", f"Timed out after {job.timeout:g}s"
+            logger.error(f"Job {job.name} timed out")
+        except Exception as e:
+            status, message = "error", str(e)
+            logger.error(f"Job {job.name} failed: {e}")
+        duration_ms = int((time.perf_counter() - timer) * 1000)
+        finished = utcnow()
+
+        job.last_started_at, job.last_finished_at = started, finished
+        job.last_status, job.last_message, job.last_duration_ms = status, message, duration_ms
+        job.run_count += 1
+        if job.leader:
+            try:
+                await self._release(job, finished, status, message, duration_ms)
+            except Exception as e:
+                logger.error(f"Could not record run of job {job.name}: {e}")
+
+    async def _skip(self, job: Job, now: datetime) -> None:
+        """Move a misfired run to the next occurrence instead of running it now"""
+        missed, job.due = job.due, job.schedule.next(now)
+        logger.warning(f"Job {job.name} missed its run at {missed.isoformat()}; next run at {job.due.isoformat()}")
+        if not job.leader:
+            return
+        try:
+            async with db_connection() as db:
+                uow = UnitOfWork(db)
+                # Only while nobody holds the lease; other workers skipping the same run write the same slot
+                uow.add(
+                    """
+                    UPDATE scheduler_jobs SET next_run_at = ?
+                    WHERE name = ? AND next_run_at <= ? AND (lease_until IS NULL OR lease_until < ?)
+                    """,
+                    [to_db_time(job.due), job.name, to_db_time(missed), to_db_time(now)]
+                )
+                await uow.commit()
+        except Exception as e:
+            # The claim refuses misfired runs too, so the job is still not run late
+            logger.error(f"Could not reschedule job {job.name}: {e}")
+
+    async def _claim(self, job: Job, now: datetime) -> bool:
+        next_run = job.schedule.next(now)
+        lease_until = now + timedelta(seconds=job.timeout + LEASE_MARGIN_SECONDS)
+        # A run older than the misfire grace is not claimed; the loop reschedules it instead
+        earliest = to_db_time(now - timedelta(seconds=job.misfire_grace)) if job.misfire_grace is not None else None
+        async with db_connection() as db:
+            uow = UnitOfWork(db)
+            claimed = uow.add(
+                """
+                UPDATE scheduler_jobs
+                SET lease_owner = ?, lease_until = ?, last_started_at = ?, next_run_at = ?
+                WHERE name = ? AND next_run_at <= ? AND (? IS NULL OR next_run_at >= ?)
+                  AND (lease_until IS NULL OR lease_until < ?)
+                RETURNING name
+                """,
+                [self.owner, to_db_time(lease_until), to_db_time(now), to_db_time(next_run),
+                 job.name, to_db_time(now), earliest, earliest, to_db_time(now)]
+            )
+            current = uow.add("SELECT next_run_at, lease_until FROM scheduler_jobs WHERE name = ?", [job.name])
+            results = await uow.commit()
+        if results[claimed].rows:
+            job.due = next_run
+            return True
+        row = results[current].fetchone()
+        if row is None:
+            # Row vanished; register again on the next loop
+            self._registered = False
+            return False
+        next_run_at, held_until = from_db_time(row[0]), row[1] and from_db_time(row[1])
+        # Due but leased elsewhere: look again once that lease could have expired
+        job.due = max(next_run_at, held_until) if held_until and next_run_at <= now else next_run_at
+        return False
+
+    async def _release(self, job: Job, finished: datetime, status: str, message: Optional[str], duration_ms: int) -> None:
+        async with db_connection() as db:
+            uow = UnitOfWork(db)
+            uow.add(
+                """
+                UPDATE scheduler_jobs
+                SET lease_owner = NULL, lease_until = NULL, last_finished_at = ?, last_status = ?,
+                    last_message = ?, last_duration_ms = ?, run_count = run_count + 1
+                WHERE name = ? AND lease_owner = ?
+                """,
+                [to_db_time(finished), status, message, duration_ms, job.name, self.owner]
+            )
+            await uow.commit()
+
+
+scheduler = Scheduler()
@@ -20,19 +20,45 @@ CREATE TABLE IF NOT EXISTS bio_buddies (
     research_subject TEXT,
     description TEXT NOT NULL,
     status TEXT DEFAULT 'pending',
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    fingerprint TEXT, -- hash of the normalized submission, for duplicate rejection
+    topic_key TEXT, -- hash of email + normalized topic, for near-duplicate flags
+    near_duplicate_of INTEGER -- earlier submission with the same topic_key
 );
 
 CREATE TABLE IF NOT EXISTS articles (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     category TEXT NOT NULL, -- magazine, achievement, resource, science_corner
     title TEXT NOT NULL,
-    content TEXT,
+    excerpt TEXT, -- plain-text start of the body, for list views
     author TEXT,
     external_link TEXT,
     file_url TEXT,
     publication_date DATE,
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME -- last admin edit, for feeds and the sitemap
+);
+
+-- Article bodies, compressed and kept apart so list queries never read them
+CREATE TABLE IF NOT EXISTS article_bodies (
+    article_id INTEGER PRIMARY KEY,
+    encoding TEXT NOT NULL, -- identity, zlib, zstd
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL -- uncompressed size in bytes
+);
+
+-- Full-text index of article bodies (rowid = article id), contentless: the text lives in article_bodies
+CREATE VIRTUAL TABLE IF NOT EXISTS article_search USING fts5(
+    body, content='', contentless_delete=1, tokenize='unicode61 remove_diacritics 2'
+);
+
+-- Article view counts, written in batches by the view counter
+CREATE TABLE IF NOT EXISTS article_stats (
+    article_id INTEGER PRIMARY KEY,
+    views INTEGER NOT NULL DEFAULT 0,
+    score REAL NOT NULL DEFAULT 0, -- forward-decayed popularity, relative to score_epoch
+    score_epoch INTEGER NOT NULL DEFAULT 0,
+    last_viewed_at DATETIME
 );
 
 CREATE TABLE IF NOT EXISTS feedbacks (
@@ -43,7 +69,8 @@ CREATE TABLE IF NOT EXISTS feedbacks (
     subject TEXT NOT NULL,
     message TEXT NOT NULL,
     is_read INTEGER DEFAULT 0,
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    fingerprint TEXT -- hash of the normalized message, for duplicate rejection
 );
 
 CREATE TABLE IF NOT EXISTS labs (
@@ -74,6 +101,32 @@ CREATE TABLE IF NOT EXISTS audit_logs (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Attachments (files stored on local disk under their SHA-256)
+CREATE TABLE IF NOT EXISTS attachments (
+    sha256 TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    has_preview INTEGER DEFAULT 0,
+    uploaded_by TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Background job leases and last run (one row per cluster-wide job)
+CREATE TABLE IF NOT EXISTS scheduler_jobs (
+    name TEXT PRIMARY KEY,
+    schedule TEXT NOT NULL,
+    next_run_at DATETIME NOT NULL,
+    lease_owner TEXT, -- worker running the job, NULL when idle
+    lease_until DATETIME,
+    last_started_at DATETIME,
+    last_finished_at DATETIME,
+    last_status TEXT, -- ok, error, timeout
+    last_message TEXT,
+    last_duration_ms INTEGER,
+    run_count INTEGER NOT NULL DEFAULT 0
+);
+
 -- Insert default system settings
 INSERT OR IGNORE INTO system_settings (key, value) VALUES ('registration_enabled', 'true');
 INSERT OR IGNORE INTO system_settings (key, value) VALUES ('maintenance_mode', 'false');
@@ -0,0 +1,160 @@
+"""
+Serialization Module for BiosciZone
+Encodes libsql rows straight to JSON bytes, skipping per-row Pydantic validation
+"""
+
+import hashlib
+import types
+from datetime import datetime
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Type, Union, get_args, get_origin
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import Response, StreamingResponse
+
+# Lists longer than this are streamed in chunks instead of encoded into one buffer
+STREAM_THRESHOLD_ROWS = 5000
+STREAM_CHUNK_ROWS = 1000
+
+
+def _sqlite_datetime_to_iso(value: Any) -> Any:
+    """Match Pydantic's datetime output for SQLite's "YYYY-MM-DD HH:MM:SS" strings"""
+    if isinstance(value, str):
+        if len(value) == 19 and value[10] == " ":
+            return value[:10] + "T" + value[11:]
+        try:
+            return datetime.fromisoformat(value).isoformat()
+        except ValueError:
+            return value
+    return value
+
+
+def _is_datetime(annotation: Any) -> bool:
+    if annotation is datetime:
+        return True
+    return get_origin(annotation) in (Union, types.UnionType) and datetime in get_args(annotation)
+
+
+class RowEncoder:
+    """
+    Turns rows into JSON shaped like a response model
+
+    The OpenAPI schema still comes from the route's `response_model`; this only
+    replaces the runtime validate-then-serialize step. Column mappers are built
+    once per distinct column layout and cached.
+    """
+
+    def __init__(self, model: Optional[Type[BaseModel]] = None):
+        self.model = model
+        self._mappers: Dict[Tuple[str, ...], Callable[[Sequence[Any]], Dict[str, Any]]] = {}
+
+    def _build_mapper(self, columns: Tuple[str, ...]) -> Callable[[Sequence[Any]], Dict[str, Any]]:
+        if self.model is None:
+            return lambda row: dict(zip(columns, row))
+
+        fields = self.model.model_fields
+        keys = tuple(fields)
+        converters = [
+            (name, _sqlite_datetime_to_iso) for name, info in fields.items() if _is_datetime(info.annotation)
+        ]
+        missing = [name for name in keys if name not in columns]
+
+        if columns == keys:
+            pick = None
+        else:
+            # Project and reorder to the model's fields; absent columns become null
+            present = [name for name in keys if name in columns]
+            keys = tuple(present) + tuple(missing)
+            indices = [columns.index(name) for name in present]
+            if len(indices) > 1:
+                pick = itemgetter(*indices)
+            else:
+                # itemgetter with a single index returns a bare value, not a tuple
+                pick = lambda row: tuple(row[i] for i in indices)
+        padding = (None,) * len(missing)
+
+        def mapper(row: Sequence[Any]) -> Dict[str, Any]:
+            values = pick(row) + padding if pick else row
+            item = dict(zip(keys, values))
+            for name, convert in converters:
+                item[name] = convert(item[name])
+            return item
+
+        return mapper
+
+    def mapper_for(self, description: Sequence[Sequence[Any]]) -> Callable[[Sequence[Any]], Dict[str, Any]]:
+        columns = tuple(col[0] for col in description)
+        mapper = self._mappers.get(columns)
+        if mapper is None:
+            mapper = self._mappers[columns] = self._build_mapper(columns)
+        return mapper
+
+    def to_list(self, description: Sequence[Sequence[Any]], rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+        mapper = self.mapper_for(description)
+        return [mapper(row) for row in rows]
+
+    def to_dict(self, description: Sequence[Sequence[Any]], row: Sequence[Any]) -> Dict[str, Any]:
+        return self.mapper_for(description)(row)
+
+    def encode_rows(self, description: Sequence[Sequence[Any]], rows: Iterable[Sequence[Any]]) -> bytes:
+        return orjson.dumps(self.to_list(description, rows))
+
+    def encode_row(self, description: Sequence[Sequence[Any]], row: Sequence[Any]) -> bytes:
+        return orjson.dumps(self.to_dict(description, row))
+
+    def iter_encode_rows(
+        self, description: Sequence[Sequence[Any]], rows: Sequence[Sequence[Any]], chunk_rows: int = STREAM_CHUNK_ROWS
+    ) -> Iterator[bytes]:
+        """Yield a JSON array in chunks so large lists never exist as one buffer"""
+        mapper = self.mapper_for(description)
+        yield b"["
+        for start in range(0, len(rows), chunk_rows):
+            chunk = orjson.dumps([mapper(row) for row in rows[start:start + chunk_rows]])
+            yield (b"," if start else b"") + chunk[1:-1]
+        yield b"]"
+
+
+def json_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+class EncodedJSON(NamedTuple):
+    """An encoded body and its ETag, computed once and shareable between responses"""
+    body: bytes
+    etag: str
+
+
+def encode_json(body: bytes) -> EncodedJSON:
+    return EncodedJSON(body, json_etag(body))
+
+
+class JSONBytesResponse(Response):
+    """JSON response whose body has already been encoded"""
+    media_type = "application/json"
+
+    def __init__(self, content: bytes, status_code: int = 200, headers: Optional[Dict[str, str]] = None, **kwargs):
+        super().__init__(content, status_code, headers, **kwargs)
+        # Strong ETag so compressed variants are computed once per content version
+        if "etag" not in self.headers:
+            self.headers["ETag"] = json_etag(self.body)
+
+
+def json_response(data: Any, status_code: int = 200) -> JSONBytesResponse:
+    return JSONBytesResponse(orjson.dumps(data), status_code=status_code)
+
+
+def encoded_response(encoded: EncodedJSON) -> JSONBytesResponse:
+    return JSONBytesResponse(encoded.body, headers={"ETag": encoded.etag})
+
+
+def rows_response(encoder: RowEncoder, rs) -> Response:
+    """Encode a whole result set, streaming it when it is large"""
+    rows = rs.fetchall()
+    if len(rows) > STREAM_THRESHOLD_ROWS:
+        return StreamingResponse(encoder.iter_encode_rows(rs.description, rows), media_type="application/json")
+    return JSONBytesResponse(encoder.encode_rows(rs.description, rows))
+
+
+def row_response(encoder: RowEncoder, rs, row) -> JSONBytesResponse:
+    return JSONBytesResponse(encoder.encode_row(rs.description, row))
@@ -0,0 +1,22 @@
+"""
+Server Module for BiosciZone
+Gunicorn worker class used by the production profile (backend/gunicorn.conf.py)
+"""
+
+from typing import Any
+
+from uvicorn_worker import UvicornWorker
+
+
+class ProductionWorker(UvicornWorker):
+    """
+    Uvicorn worker that finishes in-flight requests on shutdown
+
+    Gunicorn's graceful_timeout bounds the whole worker exit; open requests
+    (including long-lived admin event streams) get most of that window before
+    uvicorn cancels them, leaving time for the lifespan shutdown to run.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = max(1, int(self.cfg.graceful_timeout * 0.8))
@@ -0,0 +1,199 @@
+"""
+Shared State Module for BiosciZone
+Key-value store for state that all worker processes must agree on
+"""
+
+import asyncio
+import importlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+
+from .config import settings
+
+
+class SharedState(ABC):
+    """
+    Small async key-value interface for cross-worker coordination
+
+    Used for login lockouts, cache version counters and similar counters.
+    Values are strings; every key may carry a TTL in seconds. Channels carry
+    fire-and-forget messages to whoever is subscribed at the time. Subclass this
+    to plug in another store.
+    """
+
+    # False when each worker process has its own copy
+    cluster_wide = True
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    async def add(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Set `key` only if it does not exist; returns whether it was set"""
+
+    @abstractmethod
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """Atomically add to an integer counter, (re)setting its TTL when given"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str) -> None:
+        """Deliver `message` to the current subscribers of `channel`"""
+
+    @abstractmethod
+    def subscribe(self, channel: str) -> AsyncIterator[str]:
+        """Messages published to `channel` from the first iteration on"""
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalSharedState(SharedState):
+    """
+    In-process stand-in, correct for a single worker
+
+    With several workers each process has its own copy, so limits and
+    invalidations only apply per worker; use the redis backend there.
+    """
+
+    cluster_wide = False
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._data: Dict[str, Tuple[str, Optional[float]]] = {}  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._channels: Dict[str, Set["asyncio.Queue[str]"]] = {}
+
+    def _get(self, key: str, now: float) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= now:
+            del self._data[key]
+            return None
+        return entry[0]
+
+    def _put(self, key: str, value: str, ttl: Optional[float], now: float) -> None:
+        self._data[key] = (value, now + ttl if ttl is not None else None)
+        if len(self._data) > self.max_keys:
+            for expired in [k for k, (_, expires_at) in self._data.items() if expires_at is not None and expires_at <= now]:
+                del self._data[expired]
+
+    async def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._get(key, time.monotonic())
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._put(key, value, ttl, time.monotonic())
+
+    async def add(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._get(key, now) is not None:
+                return False
+            self._put(key, value, ttl, now)
+            return True
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        now = time.monotonic()
+        with self._lock:
+            current = self._get(key, now)
+            value = int(current or 0) + amount
+            if ttl is None and current is not None:
+                ttl_left = self._data[key][1]
+                self._data[key] = (str(value), ttl_left)
+            else:
+                self._put(key, str(value), ttl, now)
+            return value
+
+    async def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    async def publish(self, channel: str, message: str) -> None:
+        for queue in self._channels.get(channel, ()):
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[str]:
+        queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._channels.setdefault(channel, set()).add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._channels[channel].discard(queue)
+
+
+class RedisSharedState(SharedState):
+    """State shared by all workers through Redis (requires the `redis` package)"""
+
+    def __init__(self, url: str, prefix: str = "bioscizone:state:"):
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("SHARED_STATE_BACKEND=redis requires the 'redis' package") from e
+        self.prefix = prefix
+        self._client = redis_asyncio.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(self.prefix + key)
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        await self._client.set(self.prefix + key, value, px=int(ttl * 1000) if ttl is not None else None)
+
+    async def add(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        px = int(ttl * 1000) if ttl is not None else None
+        return bool(await self._client.set(self.prefix + key, value, px=px, nx=True))
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.incrby(self.prefix + key, amount)
+            if ttl is not None:
+                pipe.pexpire(self.prefix + key, int(ttl * 1000))
+            result = await pipe.execute()
+        return int(result[0])
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(self.prefix + key)
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self._client.publish(self.prefix + channel, message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[str]:
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.prefix + channel)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield message["data"]
+        finally:
+            await pubsub.aclose()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_shared_state(name: str) -> SharedState:
+    """Build a backend from a name: "local", "redis" or a "package.module:ClassName" path"""
+    if name == "local":
+        return LocalSharedState()
+    if name == "redis":
+        if not settings.SHARED_STATE_REDIS_URL:
+            raise RuntimeError("SHARED_STATE_BACKEND=redis requires SHARED_STATE_REDIS_URL")
+        return RedisSharedState(settings.SHARED_STATE_REDIS_URL)
+    module_name, _, class_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+shared_state = create_shared_state(settings.SHARED_STATE_BACKEND)
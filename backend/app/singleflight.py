@@ -0,0 +1,52 @@
+"""
+Single-Flight Module for BiosciZone
+Coalesces identical concurrent calls so a burst of requests runs the work once
+"""
+
+import asyncio
+import functools
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Deduplicates in-flight calls by key
+
+    The first caller for a key starts `fn` as its own task; callers arriving
+    while it runs await the same task and receive the same result or exception.
+    The task is detached from any one caller, so a client disconnecting does not
+    cancel work other clients are waiting for. Nothing is cached once it finishes.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved even if every waiter timed out
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Single-flight call {key!r} failed: {task.exception()!r}")
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]], timeout: Optional[float] = None) -> T:
+        """
+        Run `fn` once for all concurrent callers with the same key
+
+        Raises:
+            asyncio.TimeoutError: if the shared call does not finish within `timeout`
+                seconds; the call itself keeps running for the other waiters
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        return await asyncio.wait_for(asyncio.shield(task), timeout)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,343 @@
+"""
+Attachment Storage Module for BiosciZone
+Content-addressed file storage on local disk, byte-range downloads and background previews
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import pathlib
+import re
+import shutil
+import subprocess
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from fastapi import HTTPException, status
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from .compression import etag_matches
+from .config import settings
+from .database import connect
+
+logger = logging.getLogger(__name__)
+
+STORAGE_ROOT = pathlib.Path(settings.ATTACHMENT_STORAGE_DIR or pathlib.Path(__file__).parent.parent / "storage")
+OBJECTS_DIR = STORAGE_ROOT / "objects"
+PREVIEWS_DIR = STORAGE_ROOT / "previews"
+TMP_DIR = STORAGE_ROOT / "tmp"
+
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+# Matches download URLs returned by the upload endpoint, absolute or relative
+ATTACHMENT_URL_PATTERN = re.compile(r"/api/attachments/([0-9a-f]{64})(?:$|[/?#])")
+
+PREVIEW_MAX_SIZE = (480, 480)
+READ_CHUNK_SIZE = 256 * 1024
+# Files are immutable under their hash, so caches may keep them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Only these types are shown in the browser, and only when the file's leading bytes say so;
+# anything else is downloaded, as a known document type or as application/octet-stream
+INLINE_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+]
+INLINE_TYPES = frozenset({media_type for _, media_type in INLINE_SIGNATURES} | {"image/webp"})
+DOWNLOAD_TYPES = frozenset({
+    "text/plain",
+    "text/csv",
+    "application/zip",
+    "application/msword",
+    "application/vnd.ms-excel",
+    "application/vnd.ms-powerpoint",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    "application/vnd.oasis.opendocument.text",
+    "application/vnd.oasis.opendocument.spreadsheet",
+    "application/vnd.oasis.opendocument.presentation",
+    "audio/mpeg",
+    "video/mp4",
+})
+FALLBACK_TYPE = "application/octet-stream"
+# Stored files never run as a page on the API origin, whatever they contain
+SANDBOX_HEADERS = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"content-security-policy", b"sandbox"),
+]
+
+# Previews are generated off the request path, one at a time
+_preview_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preview")
+
+
+class StoredFile(NamedTuple):
+    sha256: str
+    size: int
+    created: bool  # False when identical content was already stored
+
+
+def object_path(sha256: str) -> pathlib.Path:
+    return OBJECTS_DIR / sha256[:2] / sha256
+
+
+def preview_path(sha256: str) -> pathlib.Path:
+    return PREVIEWS_DIR / sha256[:2] / f"{sha256}.jpg"
+
+
+def attachment_sha_from_url(url: Optional[str]) -> Optional[str]:
+    """Return the hash if `url` points at a locally stored attachment"""
+    if not url:
+        return None
+    match = ATTACHMENT_URL_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+async def save_stream(chunks: AsyncIterator[bytes], max_bytes: int) -> StoredFile:
+    """
+    Write an upload to storage while hashing it, one chunk at a time
+
+    The file lands in a temp path first and is renamed to its hash, so readers
+    never see partial content and identical uploads are stored once.
+    """
+    TMP_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = TMP_DIR / uuid.uuid4().hex
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with await anyio.open_file(tmp_path, "wb") as f:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File exceeds the {max_bytes // (1024 * 1024)} MB limit"
+                    )
+                digest.update(chunk)
+                await f.write(chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Empty file")
+
+        sha256 = digest.hexdigest()
+        final_path = object_path(sha256)
+        if final_path.exists():
+            return StoredFile(sha256, size, False)
+        final_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, final_path)
+        return StoredFile(sha256, size, True)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _sniff_media_type(head: bytes) -> Optional[str]:
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, media_type in INLINE_SIGNATURES:
+        if head.startswith(signature):
+            return media_type
+    return None
+
+
+def served_media_type(content_type: str) -> str:
+    """The declared type if it is one this server hands out, otherwise a plain download"""
+    return content_type if content_type in INLINE_TYPES or content_type in DOWNLOAD_TYPES else FALLBACK_TYPE
+
+
+async def detect_media_type(sha256: str, declared: str) -> str:
+    """Media type to store for an upload: sniffed for inline types, allow-listed otherwise"""
+    async with await anyio.open_file(object_path(sha256), "rb") as f:
+        head = await f.read(16)
+    sniffed = _sniff_media_type(head)
+    if sniffed:
+        return sniffed
+    # A declared inline type that the content does not back up is not trusted
+    return declared if declared in DOWNLOAD_TYPES else FALLBACK_TYPE
+
+
+def _generate_preview(sha256: str, content_type: str) -> None:
+    source = object_path(sha256)
+    target = preview_path(sha256)
+    if target.exists():
+        return
+    try:
+        from PIL import Image
+    except ImportError:
+        logger.info("Pillow not installed, skipping attachment previews")
+        return
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=TMP_DIR) as workdir:
+        image_source = source
+        if content_type == "application/pdf":
+            # First page only, rendered small; needs poppler's pdftoppm
+            pdftoppm = shutil.which("pdftoppm")
+            if not pdftoppm:
+                return
+            prefix = pathlib.Path(workdir) / "page"
+            subprocess.run(
+                [pdftoppm, "-jpeg", "-f", "1", "-l", "1", "-scale-to", str(max(PREVIEW_MAX_SIZE)), str(source), str(prefix)],
+                check=True, timeout=60, capture_output=True,
+            )
+            pages = sorted(pathlib.Path(workdir).glob("page*.jpg"))
+            if not pages:
+                return
+            image_source = pages[0]
+
+        with Image.open(image_source) as image:
+            image.thumbnail(PREVIEW_MAX_SIZE)
+            partial = pathlib.Path(workdir) / "preview.jpg"
+            image.convert("RGB").save(partial, "JPEG", quality=80, optimize=True)
+            os.replace(partial, target)
+
+    conn = connect()
+    try:
+        conn.execute("UPDATE attachments SET has_preview = 1 WHERE sha256 = ?", [sha256])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _run_preview(sha256: str, content_type: str) -> None:
+    try:
+        _generate_preview(sha256, content_type)
+    except Exception as e:
+        logger.error(f"Preview generation failed for {sha256}: {e}")
+
+
+def schedule_preview(sha256: str, content_type: str) -> None:
+    """Queue preview generation for images and PDFs without waiting for it"""
+    if content_type.startswith("image/") or content_type == "application/pdf":
+        asyncio.get_running_loop().run_in_executor(_preview_executor, _run_preview, sha256, content_type)
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=start-end" range into an inclusive (start, end)
+
+    Returns None for headers this server ignores (other units, multiple ranges),
+    in which case the whole file is sent. Raises ValueError when unsatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_text, _, end_text = spec.strip().partition("-")
+    if not (start_text or end_text).isdigit() or (end_text and not end_text.isdigit()):
+        return None  # malformed headers are ignored, not rejected
+    if not start_text:
+        # Suffix range: the last N bytes
+        length = int(end_text)
+        if length <= 0:
+            raise ValueError("Unsatisfiable range")
+        return max(0, size - length), size - 1
+    start = int(start_text)
+    end = int(end_text) if end_text else size - 1
+    if start >= size or end < start:
+        raise ValueError("Unsatisfiable range")
+    return start, min(end, size - 1)
+
+
+class AttachmentResponse(Response):
+    """
+    ASGI response for stored files
+
+    Supports conditional GET (If-None-Match), single byte ranges (Range/If-Range)
+    and hands the file to the server for zero-copy transmission when the server
+    offers the `http.response.zerocopysend` or `http.response.pathsend` extension;
+    otherwise the file is read in chunks on a worker thread.
+    """
+
+    def __init__(self, path: pathlib.Path, etag: str, content_type: str, filename: Optional[str] = None,
+                 background: Optional[BackgroundTask] = None):
+        # Response.__init__ is skipped on purpose: the body is streamed from disk in __call__
+        self.status_code = 200
+        self.background = background
+        self.path = path
+        self.etag = etag
+        # Rows stored before uploads were sniffed may carry any client-declared type
+        self.content_type = served_media_type(content_type)
+        self.filename = filename
+
+    def _headers(self) -> list:
+        headers = [
+            (b"etag", self.etag.encode()),
+            (b"cache-control", IMMUTABLE_CACHE_CONTROL.encode()),
+            (b"accept-ranges", b"bytes"),
+            *SANDBOX_HEADERS,
+        ]
+        disposition = "inline" if self.content_type in INLINE_TYPES else "attachment"
+        if self.filename:
+            disposition = f"{disposition}; filename*=UTF-8''{quote(self.filename)}"
+        headers.append((b"content-disposition", disposition.encode("latin-1")))
+        return headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self._send_file(scope, send)
+        if self.background is not None:
+            await self.background()
+
+    async def _send_file(self, scope: Scope, send: Send) -> None:
+        request_headers = Headers(scope=scope)
+        headers = self._headers()
+        size = (await anyio.Path(self.path).stat()).st_size
+
+        if etag_matches(request_headers.get("if-none-match"), self.etag):
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        byte_range = None
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if range_header and (if_range is None or if_range == self.etag):
+            try:
+                byte_range = _parse_range(range_header, size)
+            except ValueError:
+                headers.append((b"content-range", f"bytes */{size}".encode()))
+                await send({"type": "http.response.start", "status": 416, "headers": headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        start, end = byte_range if byte_range else (0, size - 1)
+        count = end - start + 1
+        headers.append((b"content-type", self.content_type.encode("latin-1")))
+        headers.append((b"content-length", str(count).encode()))
+        if byte_range:
+            headers.append((b"content-range", f"bytes {start}-{end}/{size}".encode()))
+        await send({"type": "http.response.start", "status": 206 if byte_range else 200, "headers": headers})
+
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if "http.response.zerocopysend" in extensions:
+            with open(self.path, "rb") as f:
+                await send({"type": "http.response.zerocopysend", "file": f.fileno(), "offset": start, "count": count})
+            return
+        if "http.response.pathsend" in extensions and not byte_range:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+            return
+
+        async with await anyio.open_file(self.path, "rb") as f:
+            await f.seek(start)
+            remaining = count
+            while remaining > 0:
+                chunk = await f.read(min(READ_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,152 @@
+"""
+View Counter Module for BiosciZone
+Write-behind article view counts and the in-memory most-read ranking
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from .article_content import ARTICLE_SUMMARY_COLUMNS
+from .config import settings
+from .database import ResultSet, UnitOfWork, db_connection
+from .models import PopularArticleResponse
+from .serialization import RowEncoder
+
+logger = logging.getLogger(__name__)
+
+# Forward-decayed scores are kept relative to the start of the current score
+# epoch, which begins every EPOCH_HALF_LIVES half-lives after DECAY_EPOCH
+# (2024-01-01 UTC). Weights then stay below 2^EPOCH_HALF_LIVES, and a score
+# from the previous epoch is carried over scaled by 2^-EPOCH_HALF_LIVES.
+# Anything older has decayed to nothing and is dropped.
+DECAY_EPOCH = 1704067200
+EPOCH_HALF_LIVES = 64
+EPOCH_CARRY = 2.0 ** -EPOCH_HALF_LIVES
+
+# Rows per INSERT statement, well under SQLite's bound-parameter limit
+FLUSH_BATCH_ROWS = 500
+
+# Score of a row in the given epoch
+CURRENT_SCORE = f"CASE {{epoch}} - score_epoch WHEN 0 THEN score WHEN 1 THEN score * {EPOCH_CARRY!r} ELSE 0 END"
+
+UPSERT_STATS = f"""
+INSERT INTO article_stats (article_id, views, score, score_epoch, last_viewed_at) VALUES {{values}}
+ON CONFLICT(article_id) DO UPDATE SET
+    views = views + excluded.views,
+    score = {CURRENT_SCORE.format(epoch="excluded.score_epoch")} + excluded.score,
+    score_epoch = excluded.score_epoch,
+    last_viewed_at = excluded.last_viewed_at
+"""
+
+TOP_BY_CATEGORY = f"""
+SELECT * FROM (
+    SELECT {ARTICLE_SUMMARY_COLUMNS}, views, {CURRENT_SCORE.format(epoch="?")} AS score,
+           ROW_NUMBER() OVER (PARTITION BY category ORDER BY {CURRENT_SCORE.format(epoch="?")} DESC) AS category_rank
+    FROM articles JOIN article_stats ON article_stats.article_id = articles.id
+) WHERE category_rank <= ? ORDER BY score DESC
+"""
+
+popular_encoder = RowEncoder(PopularArticleResponse)
+
+
+def score_epoch(now: float) -> int:
+    half_life = settings.POPULARITY_HALF_LIFE_HOURS * 3600
+    return int((now - DECAY_EPOCH) // (half_life * EPOCH_HALF_LIVES))
+
+
+def decay_weight(now: float) -> float:
+    """Weight of a view at `now`; scores divided by it are views decayed to `now`"""
+    half_life = settings.POPULARITY_HALF_LIFE_HOURS * 3600
+    epoch_start = DECAY_EPOCH + score_epoch(now) * half_life * EPOCH_HALF_LIVES
+    return 2.0 ** ((now - epoch_start) / half_life)
+
+
+def top_params(now: float) -> List[Any]:
+    epoch = score_epoch(now)
+    return [epoch, epoch, settings.POPULAR_ARTICLES_PER_CATEGORY]
+
+
+class ViewCounter:
+    """
+    Article view counts that never turn a read into a write
+
+    Views are counted in memory and flushed by a scheduler job as one batched
+    upsert into article_stats, in the same hop that reloads the ranking. Scores use
+    forward decay: a view adds decay_weight(now) to the stored score, so older
+    views weigh exponentially less without old rows being rewritten on a timer.
+    Every worker flushes its own counts and reloads the shared ranking, so
+    workers agree up to one flush interval.
+    """
+
+    def __init__(self):
+        self._pending: Dict[int, int] = {}
+        self._popular: Dict[Optional[str], List[Dict[str, Any]]] = {None: []}
+        self._flush_lock = asyncio.Lock()
+
+    def record(self, article_id: int) -> None:
+        self._pending[article_id] = self._pending.get(article_id, 0) + 1
+
+    def popular(self, category: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        return self._popular.get(category, [])[:limit]
+
+    def forget(self, article_id: int) -> None:
+        """Drop a deleted article from the buffered counts and the ranking"""
+        self._pending.pop(article_id, None)
+        self._popular = {
+            category: [article for article in articles if article["id"] != article_id]
+            for category, articles in self._popular.items()
+        }
+
+    async def flush(self) -> None:
+        """Write buffered views and reload the ranking"""
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            now = time.time()
+            try:
+                async with db_connection() as db:
+                    if not pending:
+                        rs = await db.execute(TOP_BY_CATEGORY, top_params(now))
+                    else:
+                        rs = await self._write(UnitOfWork(db), pending, now)
+            except BaseException:
+                # Keep the counts for the next flush
+                for article_id, views in pending.items():
+                    self._pending[article_id] = self._pending.get(article_id, 0) + views
+                raise
+            self._load_ranking(rs, decay_weight(now))
+
+    async def _write(self, uow: UnitOfWork, pending: Dict[int, int], now: float) -> ResultSet:
+        weight = decay_weight(now)
+        epoch = score_epoch(now)
+        items = list(pending.items())
+        for start in range(0, len(items), FLUSH_BATCH_ROWS):
+            batch = items[start:start + FLUSH_BATCH_ROWS]
+            params = []
+            for article_id, views in batch:
+                params.extend([article_id, views, views * weight, epoch, now])
+            values = ", ".join(["(?, ?, ?, ?, datetime(?, 'unixepoch'))"] * len(batch))
+            uow.add(UPSERT_STATS.format(values=values), params)
+        top = uow.add(TOP_BY_CATEGORY, top_params(now))
+        return (await uow.commit())[top]
+
+    def _load_ranking(self, rs: ResultSet, weight: float) -> None:
+        popular: Dict[Optional[str], List[Dict[str, Any]]] = {None: []}
+        for article in popular_encoder.to_list(rs.description, rs.rows):
+            article["score"] = round(article["score"] / weight, 3)
+            popular.setdefault(article["category"], []).append(article)
+            # Rows are ordered by score, so the overall top-k is the first k of all categories' top-k
+            if len(popular[None]) < settings.POPULAR_ARTICLES_PER_CATEGORY:
+                popular[None].append(article)
+        self._popular = popular
+
+    async def close(self) -> None:
+        """Write whatever is still buffered at shutdown"""
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Final view counter flush failed: {e}")
+
+
+view_counter = ViewCounter()
@@ -0,0 +1,155 @@
+"""
+Benchmark: article storage size and read latency, plain vs compressed bodies
+
+Builds a database with the old layout (HTML bodies in articles.content, lists
+reading SELECT *), measures it, then applies the article-body migration in
+place and measures again:
+  - file size after VACUUM
+  - list: query plus JSON encoding of GET /api/articles, and its response size
+  - detail: query plus decompression and encoding of GET /api/articles/{id}
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_article_storage --articles 300
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+WORDS = (
+    "tế bào gen protein enzyme vi khuẩn nghiên cứu sinh học phân tử di truyền biểu hiện "
+    "thí nghiệm mẫu kết quả phân tích trình tự môi trường nuôi cấy đột biến tổng hợp "
+    "cell gene expression sequencing assay culture mutation pathway receptor membrane"
+).split()
+
+LEGACY_ARTICLES = """
+CREATE TABLE articles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category TEXT NOT NULL,
+    title TEXT NOT NULL,
+    content TEXT,
+    author TEXT,
+    external_link TEXT,
+    file_url TEXT,
+    publication_date DATE,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=30)
+    return parser.parse_args()
+
+
+def setup_environment():
+    workdir = tempfile.mkdtemp(prefix="bioscizone-bench-")
+    os.environ["TURSO_DATABASE_URL"] = os.path.join(workdir, "bench.db")
+    os.environ["TURSO_AUTH_TOKEN"] = "bench"
+    os.environ.setdefault("JWT_SECRET", "bench")
+    return os.environ["TURSO_DATABASE_URL"]
+
+
+def article_body(rng: random.Random) -> str:
+    paragraphs = []
+    for _ in range(rng.randint(8, 40)):
+        sentences = [" ".join(rng.choices(WORDS, k=rng.randint(8, 20))).capitalize() + "." for _ in range(rng.randint(3, 6))]
+        paragraphs.append(f"<p>{' '.join(sentences)}</p>")
+    return "\n".join(paragraphs)
+
+
+def build_legacy_db(count: int):
+    from backend.app.database import connect, init_db
+
+    init_db()
+    conn = connect()
+    conn.execute("DROP TABLE articles")
+    conn.execute("DROP TABLE article_bodies")
+    conn.execute(LEGACY_ARTICLES)
+    conn.execute("DELETE FROM schema_migrations WHERE version > 1")
+    rng = random.Random(42)
+    conn.executemany(
+        "INSERT INTO articles (category, title, content, author) VALUES (?, ?, ?, ?)",
+        [("science_corner", f"Article {i}", article_body(rng), "Bench") for i in range(count)]
+    )
+    conn.commit()
+    return conn
+
+
+def file_size(conn, path: str) -> int:
+    conn.execute("VACUUM")
+    return os.path.getsize(path)
+
+
+def timed(fn, repeat: int):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000, result
+
+
+def measure(conn, path: str, layout: str, repeat: int):
+    import orjson
+    from backend.app.article_content import ARTICLE_SUMMARY_COLUMNS, decode_body
+    from backend.app.routers.public import article_encoder, article_summary_encoder
+
+    size = file_size(conn, path)
+    ids = [row[0] for row in conn.execute("SELECT id FROM articles").fetchall()]
+
+    if layout == "plain":
+        def list_articles():
+            cursor = conn.execute("SELECT * FROM articles")
+            return article_encoder.encode_rows(cursor.description, cursor.fetchall())
+
+        def get_article(article_id):
+            cursor = conn.execute("SELECT * FROM articles WHERE id = ?", [article_id])
+            return article_encoder.encode_row(cursor.description, cursor.fetchone())
+    else:
+        def list_articles():
+            cursor = conn.execute(f"SELECT {ARTICLE_SUMMARY_COLUMNS} FROM articles")
+            return article_summary_encoder.encode_rows(cursor.description, cursor.fetchall())
+
+        def get_article(article_id):
+            cursor = conn.execute(
+                "SELECT a.*, b.encoding AS body_encoding, b.body FROM articles a "
+                "LEFT JOIN article_bodies b ON b.article_id = a.id WHERE a.id = ?",
+                [article_id]
+            )
+            row = cursor.fetchone()
+            article = article_encoder.to_dict(cursor.description, row)
+            article["content"] = decode_body(row[-2], row[-1]) if row[-1] is not None else None
+            return orjson.dumps(article)
+
+    list_ms, body = timed(list_articles, repeat)
+    rng = random.Random(7)
+    detail_ms, _ = timed(lambda: get_article(rng.choice(ids)), repeat * 10)
+    print(f"{layout:<11} {size / 1024:>10.0f} {list_ms:>10.2f} {len(body) / 1024:>10.0f} {detail_ms:>10.3f}")
+
+
+def main():
+    args = parse_args()
+    path = setup_environment()
+    conn = build_legacy_db(args.articles)
+
+    from backend.app.database import migrate
+
+    print(f"{args.articles} articles")
+    print(f"{'layout':<11} {'db KiB':>10} {'list ms':>10} {'list KiB':>10} {'detail ms':>10}")
+    measure(conn, path, "plain", args.repeat)
+    started = time.perf_counter()
+    migrate(conn)
+    migration_ms = (time.perf_counter() - started) * 1000
+    measure(conn, path, "compressed", args.repeat)
+    print(f"migration took {migration_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
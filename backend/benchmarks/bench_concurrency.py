@@ -0,0 +1,103 @@
+"""
+Benchmark: read throughput under concurrent clients
+
+Drives the ASGI app in-process with N concurrent clients against a local
+libsql file. Every driver call is delayed by --latency-ms to stand in for the
+network round trip to Turso, which is what ties up threads in production.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_concurrency --clients 500
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=10, help="requests per client")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--articles", type=int, default=50)
+    return parser.parse_args()
+
+
+def setup_environment(args):
+    workdir = tempfile.mkdtemp(prefix="bioscizone-bench-")
+    os.environ["TURSO_DATABASE_URL"] = os.path.join(workdir, "bench.db")
+    os.environ["TURSO_AUTH_TOKEN"] = "bench"
+    os.environ.setdefault("JWT_SECRET", "bench")
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    import libsql
+
+    real_connect = libsql.connect
+    delay = args.latency_ms / 1000
+
+    class SlowConnection:
+        """Adds a fixed delay to every round trip"""
+
+        def __init__(self, conn):
+            self._conn = conn
+
+        def execute(self, *a, **kw):
+            time.sleep(delay)
+            return self._conn.execute(*a, **kw)
+
+        def commit(self):
+            time.sleep(delay)
+            return self._conn.commit()
+
+        def __getattr__(self, name):
+            return getattr(self._conn, name)
+
+    conn = real_connect(os.environ["TURSO_DATABASE_URL"])
+    return real_connect, SlowConnection, conn
+
+
+async def run(args):
+    real_connect, SlowConnection, seed_conn = setup_environment(args)
+
+    import httpx
+    import libsql
+    from backend.app.database import init_db
+    from backend.app.main import app
+
+    init_db()
+    for i in range(args.articles):
+        seed_conn.execute(
+            "INSERT INTO articles (category, title, content) VALUES (?, ?, ?)",
+            ["magazine", f"Issue {i}", "<p>content</p>" * 50],
+        )
+    seed_conn.commit()
+    seed_conn.close()
+    libsql.connect = lambda *a, **kw: SlowConnection(real_connect(*a, **kw))
+
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                response = await client.get("/api/articles", params={"category": "magazine"})
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.status_code
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.clients)))
+        elapsed = time.perf_counter() - started
+
+    total = args.clients * args.requests
+    latencies.sort()
+    print(f"{args.clients} clients x {args.requests} requests, {args.latency_ms:.0f} ms simulated DB latency")
+    print(f"throughput: {total / elapsed:.0f} req/s")
+    print(f"latency p50: {statistics.median(latencies) * 1000:.0f} ms, "
+          f"p99: {latencies[int(len(latencies) * 0.99) - 1] * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,141 @@
+"""
+Benchmark: driver round trips per admin mutation
+
+Runs each admin mutation against a local libsql file and counts, per request,
+the hops to the DB executor and the driver calls (execute/commit, each one a
+network round trip against Turso). Every driver call is delayed by
+--latency-ms to stand in for that round trip. BEGINs the driver issues on its
+own before a write are not visible here and come on top of the count.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_mutations --repeat 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    return parser.parse_args()
+
+
+def setup_environment():
+    workdir = tempfile.mkdtemp(prefix="bioscizone-bench-")
+    os.environ["TURSO_DATABASE_URL"] = os.path.join(workdir, "bench.db")
+    os.environ["TURSO_AUTH_TOKEN"] = "bench"
+    os.environ.setdefault("JWT_SECRET", "bench")
+    os.environ["ADMIN_USERNAME"] = "bench"
+    os.environ["ADMIN_PASSWORD"] = "bench"
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+
+class Counters:
+    def __init__(self):
+        self.hops = 0
+        self.calls = 0
+
+
+def instrument(counters: Counters, delay: float):
+    import libsql
+    from backend.app import database
+
+    real_connect = libsql.connect
+    real_run = database.run_in_db_thread
+
+    class SlowConnection:
+        """Counts and delays every round trip"""
+
+        def __init__(self, conn):
+            self._conn = conn
+
+        def execute(self, *a, **kw):
+            counters.calls += 1
+            time.sleep(delay)
+            return self._conn.execute(*a, **kw)
+
+        def commit(self):
+            counters.calls += 1
+            time.sleep(delay)
+            return self._conn.commit()
+
+        def __getattr__(self, name):
+            return getattr(self._conn, name)
+
+    async def counting_run(fn, *args):
+        counters.hops += 1
+        return await real_run(fn, *args)
+
+    libsql.connect = lambda *a, **kw: SlowConnection(real_connect(*a, **kw))
+    database.run_in_db_thread = counting_run
+
+
+async def run(args):
+    setup_environment()
+
+    import httpx
+    from backend.app.database import init_db
+    from backend.app.main import app
+
+    init_db()
+    counters = Counters()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/api/admin/login", data={"username": "bench", "password": "bench"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def seed(i):
+            await client.post("/api/buddies/submit", json={
+                "full_name": f"Student {i}", "course": "K22", "email": f"s{i}@example.com",
+                "research_topic": "Genomics", "description": "Bench",
+            })
+            await client.post("/api/feedback", json={
+                "sender_name": f"Student {i}", "email": f"s{i}@example.com", "subject": "Hi", "message": "Bench",
+            })
+
+        for i in range(args.repeat):
+            await seed(i)
+
+        instrument(counters, args.latency_ms / 1000)
+
+        article_ids = []
+
+        async def create_article(i):
+            response = await client.post("/api/admin/articles", headers=headers, json={
+                "category": "magazine", "title": f"Issue {i}", "content": "<p>content</p>",
+            })
+            article_ids.append(response.json()["id"])
+            return response
+
+        mutations = [
+            ("approve buddy", lambda i: client.patch(f"/api/admin/approve-buddy/{i + 1}", headers=headers)),
+            ("create article", create_article),
+            ("update article", lambda i: client.patch(f"/api/admin/articles/{article_ids[i]}", headers=headers, json={"title": "Updated"})),
+            ("delete article", lambda i: client.delete(f"/api/admin/articles/{article_ids[i]}", headers=headers)),
+            ("update setting", lambda i: client.patch("/api/admin/settings/registration_enabled", headers=headers, json={"value": "false"})),
+            ("delete feedback", lambda i: client.delete(f"/api/admin/feedbacks/{i + 1}", headers=headers)),
+        ]
+
+        print(f"{args.latency_ms:.0f} ms simulated latency per driver call, {args.repeat} requests each")
+        print(f"{'mutation':<16} {'hops':>6} {'calls':>6} {'p50 ms':>8}")
+        for name, mutate in mutations:
+            counters.hops = counters.calls = 0
+            latencies = []
+            for i in range(args.repeat):
+                started = time.perf_counter()
+                response = await mutate(i)
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, (name, response.status_code, response.text)
+            print(f"{name:<16} {counters.hops / args.repeat:>6.1f} {counters.calls / args.repeat:>6.1f} "
+                  f"{statistics.median(latencies) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,118 @@
+"""
+Benchmark: import time and cold start against a budget
+
+Measures, in fresh interpreter processes:
+  - import: time to import backend.app.main
+  - cold start: process spawn until the server answers (lifespan warm-up included)
+  - first request: latency of the first /api/articles call after that
+
+Exits non-zero when a median exceeds its budget, so it can gate CI or a deploy.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_startup --runs 5
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import backend.app.main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=1000.0)
+    parser.add_argument("--cold-start-budget-ms", type=float, default=3000.0)
+    parser.add_argument("--first-request-budget-ms", type=float, default=200.0)
+    return parser.parse_args()
+
+
+def setup_environment():
+    workdir = tempfile.mkdtemp(prefix="bioscizone-bench-")
+    env = dict(os.environ)
+    env["TURSO_DATABASE_URL"] = os.path.join(workdir, "bench.db")
+    env["TURSO_AUTH_TOKEN"] = "bench"
+    env.setdefault("JWT_SECRET", "bench")
+    subprocess.run([sys.executable, "-c", "from backend.app.database import init_db; init_db()"], env=env, check=True)
+    return env
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get(url: str, timeout: float = 5.0) -> int:
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        response.read()
+        return response.status
+
+
+def measure_import(env) -> float:
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], env=env, check=True, capture_output=True, text=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def measure_cold_start(env):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError("Server exited during start-up")
+            try:
+                get(base + "/", timeout=1)
+                break
+            except OSError:
+                time.sleep(0.005)
+        ready = time.perf_counter() - started
+
+        request_started = time.perf_counter()
+        get(base + "/api/articles")
+        first_request = time.perf_counter() - request_started
+        return ready, first_request
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def report(name: str, samples, budget_ms: float) -> bool:
+    median_ms = statistics.median(samples) * 1000
+    ok = median_ms <= budget_ms
+    print(f"{name:<14} median {median_ms:8.1f} ms  max {max(samples) * 1000:8.1f} ms  budget {budget_ms:8.1f} ms  {'ok' if ok else 'OVER'}")
+    return ok
+
+
+def main():
+    args = parse_args()
+    env = setup_environment()
+
+    imports = [measure_import(env) for _ in range(args.runs)]
+    starts = [measure_cold_start(env) for _ in range(args.runs)]
+
+    results = [
+        report("import", imports, args.import_budget_ms),
+        report("cold start", [ready for ready, _ in starts], args.cold_start_budget_ms),
+        report("first request", [first for _, first in starts], args.first_request_budget_ms),
+    ]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
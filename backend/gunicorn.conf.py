@@ -0,0 +1,51 @@
+"""
+Production server profile for BiosciZone
+
+Run from the repository root:
+    gunicorn -c backend/gunicorn.conf.py backend.app.main:app
+
+Every setting can be overridden by the environment variables below
+(WEB_CONCURRENCY is also what Render sets from the instance size).
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# One async worker per core; each worker already overlaps I/O on its event loop
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "backend.app.server.ProductionWorker"
+
+# Import the app once in the master so forked workers share the loaded code and
+# settings; per-worker resources (threads, DB connections) are created in the
+# app's lifespan after the fork
+preload_app = True
+
+# SIGTERM/SIGINT: stop accepting, finish in-flight requests, then exit.
+# SIGHUP: start new workers and retire the old ones gracefully. With preload_app
+# the code is not re-imported on HUP, so deploy new code with a full restart.
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.environ.get("WORKER_TIMEOUT", "60"))
+keepalive = int(os.environ.get("KEEPALIVE", "5"))
+
+# Recycle workers periodically to bound memory growth; jitter avoids restarting all at once
+max_requests = int(os.environ.get("MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.environ.get("MAX_REQUESTS_JITTER", "1000"))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    """Migrate the database once, in the master, before any worker starts"""
+    from backend.app.config import settings
+    from backend.app.database import migrate_db
+
+    migrate_db()
+    if settings.ARGON2_CALIBRATE_ON_STARTUP:
+        # Benchmark while no worker competes for the CPU; workers load the stored result
+        from backend.app.auth import stored_calibration
+
+        stored_calibration(calibrate_if_missing=True)
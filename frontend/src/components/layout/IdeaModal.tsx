@@ -1,4 +1,4 @@
-import { useState, useEffect, type FC } from 'react';
+import { useState, useEffect, useMemo, type FC } from 'react';
 import {
     X,
     Lightbulb,
@@ -6,7 +6,7 @@ import {
     Loader2
 } from 'lucide-react';
 import { styles } from '../../data';
-import { submitBuddy } from '../../services/api';
+import { submitBuddy, newIdempotencyKey } from '../../services/api';
 import type { IdeaModalProps } from '../../types';
 
 const IdeaModal: FC<IdeaModalProps> = ({ isOpen, onClose, onSubmitSuccess }) => {
@@ -27,6 +27,8 @@ const IdeaModal: FC<IdeaModalProps> = ({ isOpen, onClose, onSubmitSuccess }) =>
         research_subject: '',
         description: ''
     });
+    // Retries of the same content reuse the key; any edit starts a new submission
+    const idempotencyKey = useMemo(() => newIdempotencyKey(), [formData]);
 
     useEffect(() => {
         if (isOpen && !isVisible) {
@@ -70,7 +72,7 @@ const IdeaModal: FC<IdeaModalProps> = ({ isOpen, onClose, onSubmitSuccess }) =>
                 research_field: formData.research_field || undefined,
                 research_subject: formData.research_subject || undefined,
                 description: formData.description
-            });
+            }, idempotencyKey);
 
             // Reset form
             setFormData({
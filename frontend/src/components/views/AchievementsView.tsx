@@ -6,6 +6,7 @@ import {
 import LoadingSpinner from '../layout/LoadingSpinner';
 import { styles } from '../../data';
 import { getArticles, type ArticleAPI } from '../../services/api';
+import { useArticleBodyMatches } from '../../services/articleSearch';
 import { useNavigate } from 'react-router-dom';
 
 const AchievementsView: FC = () => {
@@ -13,6 +14,7 @@ const AchievementsView: FC = () => {
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState<string | null>(null);
     const [searchQuery, setSearchQuery] = useState('');
+    const bodyMatches = useArticleBodyMatches('achievement', searchQuery);
     const navigate = useNavigate();
 
     useEffect(() => {
@@ -30,7 +32,8 @@ const AchievementsView: FC = () => {
         return (
             item.title?.toLowerCase().includes(query) ||
             item.author?.toLowerCase().includes(query) ||
-            item.content?.toLowerCase().includes(query)
+            item.excerpt?.toLowerCase().includes(query) ||
+            bodyMatches.has(item.id)
         );
     });
 
@@ -87,7 +90,7 @@ const AchievementsView: FC = () => {
                                             <h3 className={`text-xl font-bold text-[#000033] mb-2 group-hover:text-[#0066CC] transition ${styles.fonts.heading}`}>
                                                 {item.title}
                                             </h3>
-                                            <p className="text-gray-600 text-sm mb-1 line-clamp-2"><span className="font-bold">Mô tả:</span> {item.content ? item.content.replace(/<[^>]*>/g, '').replace(/&nbsp;/g, ' ') : 'Không có mô tả'}</p>
+                                            <p className="text-gray-600 text-sm mb-1 line-clamp-2"><span className="font-bold">Mô tả:</span> {item.excerpt || 'Không có mô tả'}</p>
                                             {item.author && <p className="text-[#0066CC] text-sm font-bold">{item.author}</p>}
                                         </div>
                                     </div>
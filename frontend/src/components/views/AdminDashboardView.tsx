@@ -1,4 +1,4 @@
-import { useState, useEffect, type FC } from 'react';
+import { useState, useEffect, useRef, type FC } from 'react';
 import { useNavigate } from 'react-router-dom';
 import {
     Users, FileText, MessageSquare, LogOut, Check, Trash2,
@@ -6,11 +6,11 @@ import {
 } from 'lucide-react';
 import {
     isLoggedIn, logout, getPendingBuddies, approveBuddy, deleteBuddy,
-    getAllArticles, deleteArticle,
+    getAllArticles, getArticleForEdit, deleteArticle,
     getFeedbacks, markFeedbackRead, deleteFeedback,
     getUserRoleFromToken, getSettings, updateSetting,
-    listAdmins, deleteAdmin, getAuditLogs,
-    type FeedbackAPI,
+    listAdmins, deleteAdmin, getAuditLogs, subscribeAdminEvents,
+    type FeedbackAPI, type AdminEvent,
     type AdminUser, type SystemSetting, type AuditLog
 } from '../../services/adminApi';
 import { getBuddies, type BioBuddyAPI, type ArticleAPI } from '../../services/api';
@@ -23,6 +23,9 @@ type TabType = 'buddies' | 'articles' | 'feedbacks' | 'admins' | 'settings' | 'a
 type BuddySubTab = 'pending' | 'approved';
 type ArticleCategory = 'achievement' | 'magazine' | 'science_corner' | 'resource' | 'bio_info';
 
+// How often the open tab is refetched while live updates are unavailable or incomplete
+const FALLBACK_REFRESH_MS = 30000;
+
 const ARTICLE_CATEGORIES: { value: ArticleCategory; label: string }[] = [
     { value: 'bio_info', label: 'Bio-Information' },
     { value: 'magazine', label: 'Bio-Magazine' },
@@ -53,6 +56,12 @@ const AdminDashboardView: FC = () => {
     const [editingAdmin, setEditingAdmin] = useState<AdminUser | null>(null);
     const [selectedFeedback, setSelectedFeedback] = useState<FeedbackAPI | null>(null);
 
+    // Tabs already fetched; live events keep them current after that, but only
+    // while the stream is up and carries every worker's changes
+    const loadedTabs = useRef<Set<TabType>>(new Set());
+    const streamLive = useRef(false);
+    const [reloadKey, setReloadKey] = useState(0);
+
     // Check auth on mount and get role
     useEffect(() => {
         if (!isLoggedIn()) {
@@ -66,9 +75,68 @@ const AdminDashboardView: FC = () => {
     // Load data based on active tab
     useEffect(() => {
         loadData();
-    }, [activeTab]);
+    }, [activeTab, reloadKey]);
+
+    // Apply changes made by other admins (and public submissions) as they happen
+    useEffect(() => {
+        if (!isLoggedIn()) return;
+        return subscribeAdminEvents(applyEvent, () => {
+            // Events were missed: drop everything fetched so far and refetch
+            loadedTabs.current.clear();
+            setReloadKey(k => k + 1);
+        }, (live) => {
+            streamLive.current = live;
+        });
+    }, []);
+
+    // Without a complete live stream, poll the open tab instead
+    useEffect(() => {
+        const timer = setInterval(() => {
+            if (!streamLive.current && !document.hidden) setReloadKey(k => k + 1);
+        }, FALLBACK_REFRESH_MS);
+        return () => clearInterval(timer);
+    }, []);
+
+    const applyEvent = ({ type, data }: AdminEvent) => {
+        const without = <T extends { id: number | string }>(items: T[]) => items.filter(i => i.id !== data.id);
+        switch (type) {
+            case 'buddy.pending':
+                setPendingBuddies(prev => [data, ...without(prev)]);
+                break;
+            case 'buddy.approved':
+                setPendingBuddies(prev => without(prev));
+                setApprovedBuddies(prev => [data, ...without(prev)]);
+                break;
+            case 'buddy.deleted':
+                setPendingBuddies(prev => without(prev));
+                setApprovedBuddies(prev => without(prev));
+                break;
+            case 'article.created':
+                setArticles(prev => [data, ...without(prev)]);
+                break;
+            case 'article.updated':
+                setArticles(prev => prev.map(a => a.id === data.id ? { ...a, ...data } : a));
+                break;
+            case 'article.deleted':
+                setArticles(prev => without(prev));
+                break;
+            case 'feedback.created':
+                setFeedbacks(prev => [data, ...without(prev)]);
+                break;
+            case 'feedback.read':
+                setFeedbacks(prev => prev.map(f => f.id === data.id ? { ...f, is_read: 1 } : f));
+                break;
+            case 'feedback.deleted':
+                setFeedbacks(prev => without(prev));
+                break;
+            case 'audit.created':
+                setAuditLogs(prev => [data, ...without(prev)].slice(0, 100));
+                break;
+        }
+    };
 
-    const loadData = async () => {
+    const loadData = async (force: boolean = false) => {
+        if (!force && streamLive.current && loadedTabs.current.has(activeTab)) return;
         setIsLoading(true);
         try {
             if (activeTab === 'buddies') {
@@ -94,6 +162,7 @@ const AdminDashboardView: FC = () => {
                 const data = await getSettings();
                 setSettings(data);
             }
+            loadedTabs.current.add(activeTab);
         } catch (error) {
             console.error('Failed to load data:', error);
             if ((error as Error).message === 'Session expired') {
@@ -143,10 +212,16 @@ const AdminDashboardView: FC = () => {
         }
     };
 
-    const handleEditArticle = (article: ArticleAPI) => {
-        setEditingArticle(article);
-        setArticleCategory(article.category as ArticleCategory);
-        setShowArticleModal(true);
+    const handleEditArticle = async (article: ArticleAPI) => {
+        try {
+            // Lists only carry the excerpt; the editor needs the full body (fetched without counting a view)
+            const fullArticle = await getArticleForEdit(article.id);
+            setEditingArticle(fullArticle);
+            setArticleCategory(fullArticle.category as ArticleCategory);
+            setShowArticleModal(true);
+        } catch (error) {
+            console.error('Failed to load article:', error);
+        }
     };
 
     const handleMarkRead = async (id: number) => {
@@ -183,7 +258,7 @@ const AdminDashboardView: FC = () => {
         try {
             await deleteAdmin(id);
             setAdmins(admins.filter(a => a.id !== id));
-            loadData(); // Reload to get updated audit logs
+            loadData(true);
         } catch (error) {
             alert((error as Error).message);
         }
@@ -313,6 +388,14 @@ const AdminDashboardView: FC = () => {
                                                             <div className="flex items-center gap-2 mb-1">
                                                                 <h3 className={`text-lg font-bold text-[#000033] ${styles.fonts.heading}`}>{buddy.full_name}</h3>
                                                                 <span className="px-2 py-0.5 text-[10px] font-bold bg-amber-100 text-amber-700 rounded-full uppercase">Chờ duyệt</span>
+                                                                {buddy.near_duplicate_of && (
+                                                                    <span
+                                                                        className="px-2 py-0.5 text-[10px] font-bold bg-red-100 text-red-700 rounded-full uppercase"
+                                                                        title="Cùng email và cùng đề tài với một yêu cầu trước đó"
+                                                                    >
+                                                                        Có thể trùng #{buddy.near_duplicate_of}
+                                                                    </span>
+                                                                )}
                                                             </div>
                                                             <p className="text-gray-500 text-sm">{buddy.email} • {buddy.course}</p>
                                                             <div className="mt-3">
@@ -737,7 +820,7 @@ const AdminDashboardView: FC = () => {
                     admin={editingAdmin}
                     onClose={() => { setShowAdminModal(false); setEditingAdmin(null); }}
                     onSuccess={() => {
-                        loadData();
+                        loadData(true);
                         setShowAdminModal(false);
                         setEditingAdmin(null);
                     }}
@@ -8,12 +8,14 @@ import { useNavigate } from 'react-router-dom';
 import LoadingSpinner from '../layout/LoadingSpinner';
 import { styles } from '../../data';
 import { getArticles, type ArticleAPI } from '../../services/api';
+import { useArticleBodyMatches } from '../../services/articleSearch';
 
 const BioMagazineView: FC = () => {
     const [articles, setArticles] = useState<ArticleAPI[]>([]);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState<string | null>(null);
     const [searchQuery, setSearchQuery] = useState('');
+    const bodyMatches = useArticleBodyMatches('magazine', searchQuery);
     const navigate = useNavigate();
 
     useEffect(() => {
@@ -31,7 +33,8 @@ const BioMagazineView: FC = () => {
         return (
             item.title?.toLowerCase().includes(query) ||
             item.author?.toLowerCase().includes(query) ||
-            item.content?.toLowerCase().includes(query)
+            item.excerpt?.toLowerCase().includes(query) ||
+            bodyMatches.has(item.id)
         );
     });
 
@@ -85,7 +88,7 @@ const BioMagazineView: FC = () => {
                                             {item.title}
                                         </h3>
                                         {item.author && <p className="text-sm text-gray-600 italic mb-1">{item.author}</p>}
-                                        <p className="text-sm text-[#0066CC] font-medium line-clamp-2">{item.content ? item.content.replace(/<[^>]*>/g, '').replace(/&nbsp;/g, ' ') : 'No description'}</p>
+                                        <p className="text-sm text-[#0066CC] font-medium line-clamp-2">{item.excerpt || 'No description'}</p>
                                     </div>
                                     <button
                                         onClick={(e) => { e.stopPropagation(); navigate(`/article/${item.id}`); }}
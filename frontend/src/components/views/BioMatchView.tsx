@@ -16,6 +16,7 @@ import { useNavigate } from 'react-router-dom';
 import LoadingSpinner from '../layout/LoadingSpinner';
 import { styles } from '../../data';
 import { getBuddies, getArticles, type BioBuddyAPI, type ArticleAPI } from '../../services/api';
+import { useArticleBodyMatches } from '../../services/articleSearch';
 
 type TabType = 'buddy' | 'info';
 
@@ -38,6 +39,7 @@ const BioMatchView: FC = () => {
     const [loadingArticles, setLoadingArticles] = useState(true);
     const [error, setError] = useState<string | null>(null);
     const [searchInfo, setSearchInfo] = useState('');
+    const bodyMatches = useArticleBodyMatches('bio_info', searchInfo);
 
     const courseOptions = ['All', 'K20', 'K21', 'K22', 'K23', 'K24', 'K25', 'Khác'];
     const fieldOptions = ['Di truyền', 'Sinh học phân tử', 'Sinh hóa', 'Vi sinh', 'Sinh lý thực vật', 'Sinh lý động vật', 'Sinh thái - Tiến hóa', 'Khác'];
@@ -88,8 +90,9 @@ const BioMatchView: FC = () => {
         const query = searchInfo.toLowerCase();
         return (
             item.title?.toLowerCase().includes(query) ||
-            item.content?.toLowerCase().includes(query) ||
-            item.author?.toLowerCase().includes(query)
+            item.excerpt?.toLowerCase().includes(query) ||
+            item.author?.toLowerCase().includes(query) ||
+            bodyMatches.has(item.id)
         );
     });
 
@@ -498,7 +501,7 @@ const BioMatchView: FC = () => {
                                                     {article.title}
                                                 </h4>
                                                 <p className="text-xs text-[#0066CC] line-clamp-1 opacity-80">
-                                                    {article.content ? article.content.replace(/<[^>]*>/g, '').replace(/&nbsp;/g, ' ') : 'Chi tiết thông tin...'}
+                                                    {article.excerpt || 'Chi tiết thông tin...'}
                                                 </p>
                                             </div>
                                             <ArrowRight size={18} className="text-gray-300 group-hover:text-[#0066CC] transform group-hover:translate-x-1 transition" />
@@ -1,4 +1,4 @@
-import { useState, type FC } from 'react';
+import { useState, useMemo, type FC } from 'react';
 import {
     MapPin,
     Send,
@@ -8,7 +8,7 @@ import {
 import { FaFacebookF, FaYoutube, FaTiktok } from 'react-icons/fa6';
 import { IoMail } from 'react-icons/io5';
 import { styles } from '../../data';
-import { submitFeedback } from '../../services/api';
+import { submitFeedback, newIdempotencyKey } from '../../services/api';
 
 const ContactView: FC = () => {
     const [formData, setFormData] = useState({
@@ -18,6 +18,8 @@ const ContactView: FC = () => {
         subject: '',
         message: ''
     });
+    // Retries of the same content reuse the key; any edit starts a new submission
+    const idempotencyKey = useMemo(() => newIdempotencyKey(), [formData]);
     const [isSubmitting, setIsSubmitting] = useState(false);
     const [isSuccess, setIsSuccess] = useState(false);
     const [error, setError] = useState<string | null>(null);
@@ -28,7 +30,7 @@ const ContactView: FC = () => {
         setError(null);
 
         try {
-            await submitFeedback(formData);
+            await submitFeedback(formData, idempotencyKey);
             setIsSuccess(true);
             setFormData({
                 sender_name: '',
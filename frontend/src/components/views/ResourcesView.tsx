@@ -27,7 +27,7 @@ const ResourcesView: FC = () => {
 
     // Get icon based on content type
     const getIcon = (item: ArticleAPI) => {
-        if (item.file_url?.includes('list') || item.content?.toLowerCase().includes('tổng hợp')) {
+        if (item.file_url?.includes('list') || item.excerpt?.toLowerCase().includes('tổng hợp')) {
             return <BookOpen size={24} />;
         }
         return <FileText size={24} />;
@@ -39,7 +39,7 @@ const ResourcesView: FC = () => {
         const query = searchQuery.toLowerCase();
         return (
             item.title?.toLowerCase().includes(query) ||
-            item.content?.toLowerCase().includes(query)
+            item.excerpt?.toLowerCase().includes(query)
         );
     });
 
@@ -9,12 +9,14 @@ import { useNavigate } from 'react-router-dom';
 import LoadingSpinner from '../layout/LoadingSpinner';
 import { styles } from '../../data';
 import { getArticles, type ArticleAPI } from '../../services/api';
+import { useArticleBodyMatches } from '../../services/articleSearch';
 
 const ScienceCornerView: FC = () => {
     const [articles, setArticles] = useState<ArticleAPI[]>([]);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState<string | null>(null);
     const [searchQuery, setSearchQuery] = useState('');
+    const bodyMatches = useArticleBodyMatches('science_corner', searchQuery);
     const navigate = useNavigate();
 
     useEffect(() => {
@@ -40,7 +42,8 @@ const ScienceCornerView: FC = () => {
         return (
             item.title?.toLowerCase().includes(query) ||
             item.author?.toLowerCase().includes(query) ||
-            item.content?.toLowerCase().includes(query)
+            item.excerpt?.toLowerCase().includes(query) ||
+            bodyMatches.has(item.id)
         );
     });
 
@@ -105,7 +108,7 @@ const ScienceCornerView: FC = () => {
                                             {item.title}
                                         </h3>
                                         {item.author && <p className="text-sm text-gray-500 font-bold mb-3">Tác giả: {item.author}</p>}
-                                        <p className="text-gray-600 text-sm leading-relaxed mb-4 flex-1 line-clamp-3">{item.content ? item.content.replace(/<[^>]*>/g, '').replace(/&nbsp;/g, ' ') : 'Không có mô tả'}</p>
+                                        <p className="text-gray-600 text-sm leading-relaxed mb-4 flex-1 line-clamp-3">{item.excerpt || 'Không có mô tả'}</p>
 
                                         <button
                                             onClick={(e) => { e.stopPropagation(); navigate(`/article/${item.id}`); }}
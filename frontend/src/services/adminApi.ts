@@ -146,6 +146,17 @@ export async function getAllArticles(): Promise<ArticleAPI[]> {
     return response.json();
 }
 
+/**
+ * Get one article with its full body for the editor (not counted as a view)
+ */
+export async function getArticleForEdit(id: number): Promise<ArticleAPI> {
+    const response = await fetch(`${API_BASE_URL}/api/admin/articles/${id}`, {
+        headers: authHeaders(),
+    });
+    if (!response.ok) throw new Error('Failed to fetch article');
+    return response.json();
+}
+
 /**
  * Create a new article
  */
@@ -427,3 +438,108 @@ export async function deleteFeedback(id: number): Promise<{ message: string }> {
     if (!response.ok) throw new Error('Failed to delete feedback');
     return response.json();
 }
+
+// ============ Live Updates ============
+
+export interface AdminEvent {
+    type: string;
+    data: any;
+}
+
+// Wait before opening a new stream after the browser gave up on the old one
+const EVENTS_RECONNECT_DELAY_MS = 5000;
+
+/**
+ * Get a short-lived token that only opens the admin event stream
+ */
+export async function getStreamToken(): Promise<string> {
+    const response = await fetch(`${API_BASE_URL}/api/admin/events/token`, {
+        method: 'POST',
+        headers: authHeaders(),
+    });
+
+    if (!response.ok) {
+        if (response.status === 401) {
+            removeToken();
+            throw new Error('Session expired');
+        }
+        throw new Error('Failed to open live updates');
+    }
+
+    return (await response.json()).stream_token;
+}
+
+/**
+ * Subscribe to admin change events (Server-Sent Events).
+ * EventSource reconnects on its own and resumes from the last received event;
+ * `onResync` fires when events were missed and the data must be refetched.
+ * `onStatus(true)` means the stream is up and carries every change; after
+ * `onStatus(false)` (stream down, or the server only relays its own worker's
+ * changes) the data must be refetched to stay current.
+ * Returns a function that closes the stream.
+ */
+export function subscribeAdminEvents(
+    onEvent: (event: AdminEvent) => void,
+    onResync: () => void,
+    onStatus: (live: boolean) => void,
+): () => void {
+    let source: EventSource | null = null;
+    let lastEventId = '';
+    let closed = false;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+
+    const reconnectLater = () => {
+        if (!closed) retryTimer = setTimeout(connect, EVENTS_RECONNECT_DELAY_MS);
+    };
+
+    const connect = async () => {
+        let token: string;
+        try {
+            token = await getStreamToken();
+        } catch (error) {
+            console.error('Live updates unavailable:', error);
+            if ((error as Error).message !== 'Session expired') reconnectLater();
+            return;
+        }
+        if (closed) return;
+
+        // EventSource cannot send headers, so a single-purpose token goes in the query string
+        const params = new URLSearchParams({ stream_token: token });
+        if (lastEventId) params.set('last_event_id', lastEventId);
+        const current = new EventSource(`${API_BASE_URL}/api/admin/events?${params}`);
+        source = current;
+
+        current.addEventListener('change', (e) => {
+            lastEventId = (e as MessageEvent).lastEventId || lastEventId;
+            try {
+                onEvent(JSON.parse((e as MessageEvent).data));
+            } catch (error) {
+                console.error('Invalid admin event:', error);
+            }
+        });
+        current.addEventListener('resync', () => onResync());
+        current.addEventListener('ready', (e) => {
+            try {
+                onStatus(!!JSON.parse((e as MessageEvent).data).complete);
+            } catch {
+                onStatus(false);
+            }
+        });
+        current.onerror = () => {
+            onStatus(false);
+            // The browser retries a dropped stream with the same URL, whose token expires
+            // within a minute; once a retry is refused it stops, so start over with a new token
+            if (current.readyState === EventSource.CLOSED) {
+                source = null;
+                reconnectLater();
+            }
+        };
+    };
+
+    connect();
+    return () => {
+        closed = true;
+        clearTimeout(retryTimer);
+        source?.close();
+    };
+}
@@ -15,13 +15,18 @@ export interface BioBuddyAPI {
     description: string;
     status: string;
     created_at: string;
+    // Only set in admin responses: earlier submission with the same email and topic
+    near_duplicate_of?: number | null;
 }
 
 export interface ArticleAPI {
     id: number;
     category: string;
     title: string;
-    content: string | null;
+    // Plain-text start of the body; lists carry only this
+    excerpt: string | null;
+    // Full HTML body, only returned by getArticle (and the admin getArticleForEdit)
+    content?: string | null;
     author: string | null;
     external_link: string | null;
     file_url: string | null;
@@ -59,6 +64,25 @@ export async function getBuddies(course?: string): Promise<BioBuddyAPI[]> {
     return response.json();
 }
 
+const DUPLICATE_MESSAGE = 'Nội dung này đã được gửi trước đó, vui lòng không gửi lại.';
+
+/**
+ * Headers for public form submissions. The same idempotency key is reused when
+ * a submission is retried, so the server processes it only once.
+ */
+function submitHeaders(idempotencyKey?: string): HeadersInit {
+    return idempotencyKey
+        ? { 'Content-Type': 'application/json', 'Idempotency-Key': idempotencyKey }
+        : { 'Content-Type': 'application/json' };
+}
+
+/**
+ * Create a key identifying one filled-in form
+ */
+export function newIdempotencyKey(): string {
+    return crypto.randomUUID();
+}
+
 /**
  * Submit a new buddy request
  */
@@ -72,24 +96,28 @@ export async function submitBuddy(data: {
     research_field?: string;
     research_subject?: string;
     description: string;
-}): Promise<{ message: string }> {
+}, idempotencyKey?: string): Promise<{ message: string }> {
     const response = await fetch(`${API_BASE_URL}/api/buddies/submit`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: submitHeaders(idempotencyKey),
         body: JSON.stringify(data),
     });
+    if (response.status === 409) throw new Error(DUPLICATE_MESSAGE);
     if (!response.ok) throw new Error('Failed to submit buddy');
     return response.json();
 }
 
 /**
- * Fetch articles by category
+ * Fetch articles by category, optionally only those matching `query` in the title, author or body
  */
-export async function getArticles(category?: string): Promise<ArticleAPI[]> {
+export async function getArticles(category?: string, query?: string): Promise<ArticleAPI[]> {
     const params = new URLSearchParams();
     if (category) {
         params.append('category', category);
     }
+    if (query) {
+        params.append('q', query);
+    }
     const url = `${API_BASE_URL}/api/articles${params.toString() ? `?${params}` : ''}`;
     const response = await fetch(url);
     if (!response.ok) throw new Error('Failed to fetch articles');
@@ -135,12 +163,13 @@ export async function submitFeedback(data: {
     student_id?: string;
     subject: string;
     message: string;
-}): Promise<{ message: string }> {
+}, idempotencyKey?: string): Promise<{ message: string }> {
     const response = await fetch(`${API_BASE_URL}/api/feedback`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: submitHeaders(idempotencyKey),
         body: JSON.stringify(data),
     });
+    if (response.status === 409) throw new Error(DUPLICATE_MESSAGE);
     if (!response.ok) throw new Error('Failed to submit feedback');
     return response.json();
 }
@@ -0,0 +1,34 @@
+import { useEffect, useState } from 'react';
+import { getArticles } from './api';
+
+// Wait for typing to pause before asking the server
+const SEARCH_DEBOUNCE_MS = 300;
+
+/**
+ * Ids of articles in `category` whose body matches `query`.
+ * Lists only carry the excerpt, so words further into an article are
+ * found by the server's full-text search instead of the local filter.
+ */
+export function useArticleBodyMatches(category: string, query: string): Set<number> {
+    const [matches, setMatches] = useState<Set<number>>(new Set());
+
+    useEffect(() => {
+        const trimmed = query.trim();
+        if (!trimmed) {
+            setMatches(new Set());
+            return;
+        }
+        let cancelled = false;
+        const timer = setTimeout(() => {
+            getArticles(category, trimmed)
+                .then(data => { if (!cancelled) setMatches(new Set(data.map(a => a.id))); })
+                .catch(() => { if (!cancelled) setMatches(new Set()); });
+        }, SEARCH_DEBOUNCE_MS);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [category, query]);
+
+    return matches;
+}